@@ -0,0 +1,35 @@
+# Конфигурация gunicorn: запуск из папки с manage.py командой `gunicorn`.
+import multiprocessing
+import os
+
+wsgi_app = 'yatube.wsgi:application'
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Приложение импортируется один раз в мастере, воркеры получают его
+# через fork и разделяют память.
+preload_app = True
+
+workers = int(
+    os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+)
+threads = int(os.getenv('GUNICORN_THREADS', 2))
+worker_class = 'gthread'
+
+# Плавный перезапуск воркеров, со случайным разбросом, чтобы они не
+# перезапускались все одновременно.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+graceful_timeout = 30
+timeout = 30
+keepalive = 5
+
+
+def post_fork(server, worker):
+    from django.db import connections
+
+    from yatube.warmup import warm_up
+
+    # Соединения, открытые в мастере, нельзя делить между процессами.
+    for connection in connections.all():
+        connection.close()
+    warm_up()
@@ -1,6 +1,144 @@
-from django.contrib import admin
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.views.main import PAGE_VAR, ChangeList
+from django.core.paginator import EmptyPage, Paginator
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
 
-from .models import Group, Post
+from .export import CONTENT_TYPES, FORMATS, export_lines, parse_columns
+from .jobs import enqueue
+from .models import BulkJob, Group, Post
+
+
+CURSOR_VAR = 'after'
+CURSOR_FIELDS = ['pub_date', 'pk']
+
+
+def parse_cursor(value):
+    """Курсор «pub_date,pk» последней строки предыдущей страницы."""
+    pub_date, _, pk = value.rpartition(',')
+    pub_date = parse_datetime(pub_date)
+    if pub_date is None or not pk.isdigit():
+        return None
+    return pub_date, int(pk)
+
+
+class LargeTablePaginator(Paginator):
+    """
+    Пагинатор для больших таблиц.
+
+    Считает строки не дальше ADMIN_COUNT_LIMIT. Это оценка снизу: номера
+    страниц дальше неё не считаются ошибкой, ошибка — только пустая
+    страница. При сортировке по дате (pub_date и pk в одну сторону)
+    следующая страница берётся по курсору — ключу последней строки
+    предыдущей (?after=<pub_date,pk>) — условием по индексу, без OFFSET.
+    """
+
+    def __init__(self, *args, cursor=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cursor = cursor
+        self.cursor_used = False
+        self.next_cursor = None
+
+    @cached_property
+    def counted(self):
+        return self.object_list.order_by()[
+            :settings.ADMIN_COUNT_LIMIT + 1
+        ].count()
+
+    @cached_property
+    def count(self):
+        return min(self.counted, settings.ADMIN_COUNT_LIMIT)
+
+    @property
+    def count_capped(self):
+        return self.counted > settings.ADMIN_COUNT_LIMIT
+
+    @cached_property
+    def key_fields(self):
+        ordering = self.object_list.query.order_by
+        if not ordering:
+            return None
+        descending = {field.startswith('-') for field in ordering}
+        if len(descending) != 1 or any(
+            not isinstance(field, str) or '__' in field for field in ordering
+        ):
+            return None
+        return [field.lstrip('-') for field in ordering], descending.pop()
+
+    @property
+    def supports_cursor(self):
+        return (
+            self.key_fields is not None
+            and self.key_fields[0] == CURSOR_FIELDS
+        )
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            # Число страниц посчитано по оценке, дальние страницы
+            # проверяются в page().
+            if self.count_capped and int(number) > 1:
+                return int(number)
+            raise
+
+    def after_cursor(self):
+        pub_date, pk = self.cursor
+        lookup = 'lt' if self.key_fields[1] else 'gt'
+        return self.object_list.filter(
+            Q(**{f'pub_date__{lookup}': pub_date})
+            | Q(pub_date=pub_date, **{f'pk__{lookup}': pk})
+        )
+
+    def page(self, number):
+        number = self.validate_number(number)
+        self.cursor_used = self.cursor is not None and self.supports_cursor
+        if self.cursor_used:
+            rows = self.after_cursor()
+        else:
+            rows = self.object_list[(number - 1) * self.per_page:]
+        # Queryset, а не список: по нему строится формсет list_editable.
+        # Первая проверка читает строки, дальше они берутся из кэша.
+        objects = rows[:self.per_page]
+        if not objects and number > 1:
+            raise EmptyPage('Страница пуста')
+        if self.supports_cursor and len(objects) == self.per_page:
+            last = objects[len(objects) - 1]
+            self.next_cursor = f'{last.pub_date.isoformat()},{last.pk}'
+        return self._get_page(objects, number, self)
+
+
+class PostChangeList(ChangeList):
+    def next_page_url(self):
+        """Ссылка на следующую страницу по курсору, если он есть."""
+        cursor = getattr(self.paginator, 'next_cursor', None)
+        if cursor is None:
+            return None
+        return self.get_query_string({CURSOR_VAR: cursor}, [PAGE_VAR])
+
+
+class PostActionForm(ActionForm):
+    group = forms.SlugField(
+        required=False,
+        label='Группа (slug)',
+        help_text='Для смены группы; пусто — убрать группу.',
+    )
+    columns = forms.CharField(
+        required=False,
+        label='Колонки',
+        help_text='Для выгрузки, через запятую; пусто — все.',
+    )
+    export_format = forms.ChoiceField(
+        choices=[(name, name.upper()) for name in FORMATS],
+        required=False,
+        label='Формат',
+    )
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -12,10 +150,115 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
+    show_full_result_count = False
+    paginator = LargeTablePaginator
+    action_form = PostActionForm
+    actions = (
+        'reassign_group',
+        'delete_with_media',
+        'export_stream',
+        'export_file',
+    )
     empty_value_display = '-пусто-'
 
+    def changelist_view(self, request, extra_context=None):
+        # Иначе ChangeList примет курсор за фильтр по полю.
+        if CURSOR_VAR in request.GET:
+            request.GET = request.GET.copy()
+            request.changelist_cursor = parse_cursor(
+                request.GET.pop(CURSOR_VAR)[-1]
+            )
+        return super().changelist_view(request, extra_context)
+
+    def get_changelist(self, request, **kwargs):
+        return PostChangeList
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        return self.paginator(
+            queryset,
+            per_page,
+            orphans,
+            allow_empty_first_page,
+            cursor=getattr(request, 'changelist_cursor', None),
+        )
+
+    def get_actions(self, request):
+        # Стандартное удаление строит страницу подтверждения со всеми
+        # объектами и удаляет их по одному.
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def enqueue(self, request, action, queryset, **params):
+        job = enqueue(action, queryset, request.user, **params)
+        url = reverse('admin:posts_bulkjob_change', args=(job.pk,))
+        self.message_user(
+            request,
+            f'Операция «{job.get_action_display()}» для {job.total} постов '
+            f'поставлена в очередь: {url}',
+            messages.SUCCESS,
+        )
+
+    def reassign_group(self, request, queryset):
+        slug = request.POST.get('group', '')
+        if slug and not Group.objects.filter(slug=slug).exists():
+            self.message_user(
+                request, f'Группа {slug} не найдена', messages.ERROR
+            )
+            return
+        self.enqueue(request, BulkJob.REASSIGN_GROUP, queryset, group=slug)
+    reassign_group.short_description = 'Сменить группу (в фоне)'
+
+    def delete_with_media(self, request, queryset):
+        self.enqueue(request, BulkJob.DELETE, queryset)
+    delete_with_media.short_description = 'Удалить с картинками (в фоне)'
+
+    def get_export_options(self, request):
+        try:
+            columns = parse_columns(request.POST.get('columns'))
+        except ValueError as error:
+            self.message_user(request, str(error), messages.ERROR)
+            return None
+        export_format = request.POST.get('export_format') or 'csv'
+        if export_format not in FORMATS:
+            export_format = 'csv'
+        return columns, export_format
+
+    def export_stream(self, request, queryset):
+        options = self.get_export_options(request)
+        if options is None:
+            return None
+        columns, export_format = options
+        response = StreamingHttpResponse(
+            export_lines(queryset, columns, export_format),
+            content_type=CONTENT_TYPES[export_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="posts.{export_format}"'
+        )
+        return response
+    export_stream.short_description = 'Выгрузить (скачать сразу)'
+
+    def export_file(self, request, queryset):
+        options = self.get_export_options(request)
+        if options is None:
+            return
+        columns, export_format = options
+        self.enqueue(
+            request,
+            BulkJob.EXPORT,
+            queryset,
+            columns=','.join(columns),
+            format=export_format,
+        )
+    export_file.short_description = 'Выгрузить в файл (в фоне)'
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = (
@@ -29,5 +272,42 @@ class GroupAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+class BulkJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'action',
+        'status',
+        'progress',
+        'result',
+        'created',
+        'finished',
+        'created_by',
+    )
+    list_filter = ('status', 'action')
+    list_select_related = ('created_by',)
+    exclude = ('post_ids',)
+    readonly_fields = (
+        'action',
+        'status',
+        'params',
+        'total',
+        'processed',
+        'result',
+        'created',
+        'finished',
+        'created_by',
+    )
+
+    def progress(self, job):
+        if not job.total:
+            return '100%'
+        return f'{job.processed * 100 // job.total}%'
+    progress.short_description = 'Прогресс'
+
+    def has_add_permission(self, request):
+        return False
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
+admin.site.register(BulkJob, BulkJobAdmin)
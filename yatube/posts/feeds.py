@@ -0,0 +1,148 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import caches
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import parse_http_date_safe, quote_etag
+
+from yatube.compression import mark_cached
+from yatube.stampede import get_or_compute
+from yatube.surrogate import tag_response
+
+from .models import Group, Post, group_surrogate_key
+
+FEED_VERSION_KEY = 'posts:feed:version'
+# Ключ прокси для всех лент и главной: сбрасывается любым изменением постов.
+FEED_SURROGATE_KEY = 'feed'
+
+
+def get_feed_version():
+    cache = caches[settings.FEED_CACHE_ALIAS]
+    version = cache.get(FEED_VERSION_KEY)
+    if version is None:
+        # Начальная версия от времени, чтобы после вытеснения ключа
+        # не получить снова старые записи кэша.
+        cache.add(FEED_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(FEED_VERSION_KEY)
+    return version
+
+
+def invalidate_feeds():
+    """Сбрасывает все закэшированные ленты во всех воркерах."""
+    # Новая версия от времени, а не incr: в файловом кэше incr — это
+    # чтение и запись, и одновременные сбросы затёрли бы друг друга.
+    caches[settings.FEED_CACHE_ALIAS].set(
+        FEED_VERSION_KEY, time.time_ns(), None
+    )
+
+
+def render_feed(feed_view, request, *args, **kwargs):
+    key = (
+        f'posts:feed:{get_feed_version()}:'
+        f'{request.get_host()}:{request.path}'
+    )
+
+    def compute():
+        response = feed_view(request, *args, **kwargs)
+        return {
+            'content': response.content,
+            'content_type': response['Content-Type'],
+            'etag': quote_etag(hashlib.md5(response.content).hexdigest()),
+            'last_modified': response.get('Last-Modified'),
+        }
+    return get_or_compute(key, compute, settings.FEED_CACHE_TIMEOUT)
+
+
+def cached_feed(feed_view):
+    """Отдаёт ленту из кэша с ETag и Last-Modified."""
+    @wraps(feed_view)
+    def view(request, *args, **kwargs):
+        entry = render_feed(feed_view, request, *args, **kwargs)
+        last_modified = entry['last_modified']
+        response = get_conditional_response(
+            request,
+            etag=entry['etag'],
+            last_modified=(
+                parse_http_date_safe(last_modified) if last_modified
+                else None
+            ),
+        )
+        if response is None:
+            response = mark_cached(HttpResponse(
+                entry['content'], content_type=entry['content_type']
+            ))
+        response['ETag'] = entry['etag']
+        if last_modified:
+            response['Last-Modified'] = last_modified
+        patch_cache_control(response, public=True, max_age=0)
+        slug = kwargs.get('slug')
+        return tag_response(
+            response,
+            FEED_SURROGATE_KEY,
+            group_surrogate_key(slug) if slug else None,
+        )
+    return view
+
+
+class LatestPostsFeed(Feed):
+    description = 'Последние обновления на сайте'
+
+    def get_object(self, request, slug=None):
+        if slug is None:
+            return None
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, group):
+        if group is None:
+            return 'Yatube'
+        return f'Yatube: {group.title}'
+
+    def link(self, group):
+        return reverse('posts:index')
+
+    def items(self, group):
+        post_list = Post.objects.select_related('author', 'group')
+        if group is not None:
+            post_list = post_list.filter(group=group)
+        return post_list[:settings.FEED_SIZE]
+
+    def item_title(self, post):
+        return str(post)
+
+    def item_description(self, post):
+        return post.text
+
+    def item_author_name(self, post):
+        return post.author.get_full_name() or post.author.get_username()
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+rss_feed = cached_feed(LatestPostsFeed())
+atom_feed = cached_feed(LatestPostsAtomFeed())
+
+
+def prime_feeds(host):
+    """Собирает общие ленты в кэш заранее, до первых запросов."""
+    for url_name, feed_view in (
+        ('posts:feed_rss', rss_feed.__wrapped__),
+        ('posts:feed_atom', atom_feed.__wrapped__),
+    ):
+        request = HttpRequest()
+        request.method = 'GET'
+        request.path = reverse(url_name)
+        request.META = {'HTTP_HOST': host, 'SERVER_PORT': '80'}
+        render_feed(feed_view, request)
@@ -0,0 +1,27 @@
+from PIL import Image
+
+
+def image_metadata(file_):
+    """
+    Размеры, формат, вес и средний цвет картинки для Post.
+    Для файла, который Pillow не читает, возвращает пустой словарь.
+    """
+    file_.seek(0)
+    try:
+        with Image.open(file_) as image:
+            width, height = image.size
+            image_format = image.format or ''
+            red, green, blue = image.convert('RGB').resize(
+                (1, 1)
+            ).getpixel((0, 0))
+    except OSError:
+        return {}
+    finally:
+        file_.seek(0)
+    return {
+        'image_width': width,
+        'image_height': height,
+        'image_size': file_.size,
+        'image_format': image_format,
+        'image_color': f'#{red:02x}{green:02x}{blue:02x}',
+    }
@@ -0,0 +1,138 @@
+"""
+Массовые операции над постами из админки.
+
+Админка только ставит BulkJob в очередь, а выполняет её воркер
+run_bulk_jobs: пачками по BULK_JOB_CHUNK_SIZE и одним UPDATE/DELETE на
+пачку, без работы обработчиков сигналов на каждый объект, с записью
+прогресса после пачки. Кэш лент и прокси сбрасываются после каждой пачки.
+"""
+import json
+import os
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+
+from yatube.surrogate import purge
+
+from .export import export_lines, parse_columns
+from .models import BulkJob, Group, Post, post_surrogate_key
+
+
+def enqueue(action, queryset, user=None, **params):
+    post_ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+    return BulkJob.objects.create(
+        action=action,
+        params=json.dumps(params),
+        post_ids=json.dumps(post_ids),
+        total=len(post_ids),
+        created_by=user,
+    )
+
+
+def chunks(ids):
+    size = settings.BULK_JOB_CHUNK_SIZE
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def purge_posts(ids):
+    from .feeds import FEED_SURROGATE_KEY, invalidate_feeds
+
+    # Сначала свои ленты, потом прокси: иначе он заберёт старую ленту.
+    transaction.on_commit(invalidate_feeds)
+    purge(FEED_SURROGATE_KEY, *map(post_surrogate_key, ids))
+
+
+def reassign_group(job, ids, params):
+    slug = params.get('group')
+    group = Group.objects.get(slug=slug) if slug else None
+    for chunk in chunks(ids):
+        Post.objects.filter(pk__in=chunk).update(group=group)
+        purge_posts(chunk)
+        yield len(chunk)
+    job.result = f'Группа: {group or "-пусто-"}'
+
+
+def release_images(names):
+    from .signals import release_image
+
+    field = Post._meta.get_field('image')
+    for name in names:
+        release_image(FieldFile(None, field, name))
+
+
+def delete_posts(job, ids, params):
+    from .signals import batched
+
+    for chunk in chunks(ids):
+        posts = Post.objects.filter(pk__in=chunk)
+        with transaction.atomic(), batched():
+            names = [
+                name for name in posts.values_list('image', flat=True)
+                if name
+            ]
+            posts.delete()
+            transaction.on_commit(lambda names=names: release_images(names))
+            purge_posts(chunk)
+        yield len(chunk)
+
+
+def export_posts(job, ids, params):
+    columns = parse_columns(params.get('columns'))
+    export_format = params.get('format', 'csv')
+    os.makedirs(settings.EXPORT_ROOT, exist_ok=True)
+    path = os.path.join(
+        settings.EXPORT_ROOT, f'posts-{job.pk}.{export_format}'
+    )
+    with open(path, 'w', newline='', encoding='utf-8') as output:
+        for number, chunk in enumerate(chunks(ids)):
+            output.writelines(export_lines(
+                Post.objects.filter(pk__in=chunk),
+                columns,
+                export_format,
+                header=not number,
+            ))
+            yield len(chunk)
+    job.result = path
+
+
+HANDLERS = {
+    BulkJob.REASSIGN_GROUP: reassign_group,
+    BulkJob.DELETE: delete_posts,
+    BulkJob.EXPORT: export_posts,
+}
+
+
+def run_job(job):
+    claimed = BulkJob.objects.filter(
+        pk=job.pk, status=BulkJob.PENDING
+    ).update(status=BulkJob.RUNNING)
+    if not claimed:
+        return False
+    ids = json.loads(job.post_ids)
+    params = json.loads(job.params)
+    try:
+        for done in HANDLERS[job.action](job, ids, params):
+            job.processed += done
+            BulkJob.objects.filter(pk=job.pk).update(
+                processed=job.processed
+            )
+    except Exception as error:
+        job.status = BulkJob.FAILED
+        job.result = str(error)[:255]
+    else:
+        job.status = BulkJob.DONE
+    job.finished = timezone.now()
+    job.save(update_fields=('status', 'result', 'processed', 'finished'))
+    return True
+
+
+def run_pending_jobs():
+    count = 0
+    for job in BulkJob.objects.filter(status=BulkJob.PENDING).order_by(
+        'created'
+    ):
+        count += run_job(job)
+    return count
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from posts.feeds import invalidate_feeds
+from posts.models import ArchivedPost, Post
+from posts.signals import batched
+
+
+class Command(BaseCommand):
+    help = 'Переносит старые посты в архивную таблицу пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days',
+            type=int,
+            default=settings.ARCHIVE_AFTER_DAYS,
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        old_posts = Post.objects.filter(pub_date__lt=cutoff).order_by('pk')
+        if options['dry_run']:
+            self.stdout.write(f'К переносу постов: {old_posts.count()}')
+            return
+        fields = [field.attname for field in Post._meta.concrete_fields]
+        moved = 0
+        while True:
+            # Чтение в той же транзакции, что перенос, и под блокировкой
+            # строк (где база её умеет): правка поста между чтением и
+            # удалением иначе потерялась бы.
+            with transaction.atomic():
+                rows = list(
+                    old_posts.select_for_update()
+                    .values(*fields)[:options['batch_size']]
+                )
+                if not rows:
+                    break
+                ArchivedPost.objects.bulk_create(
+                    ArchivedPost(**row) for row in rows
+                )
+                # Без работы обработчиков: картинка переходит в архив
+                # вместе с постом и не должна освобождаться.
+                with batched():
+                    Post.objects.filter(
+                        pk__in=[row['id'] for row in rows]
+                    ).delete()
+            moved += len(rows)
+            self.stdout.write(f'Перенесено постов: {moved}')
+        if moved:
+            invalidate_feeds()
+        self.stdout.write(f'Готово: в архив перенесено {moved}')
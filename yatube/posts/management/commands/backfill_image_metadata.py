@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from posts.images import image_metadata
+from posts.models import Post
+
+FIELDS = (
+    'image_width',
+    'image_height',
+    'image_size',
+    'image_format',
+    'image_color',
+)
+
+
+def read_metadata(post):
+    try:
+        with post.image.open('rb') as file_:
+            return post, image_metadata(file_)
+    except OSError:
+        return post, {}
+
+
+class Command(BaseCommand):
+    help = 'Заполняет метаданные картинок у постов, где их ещё нет.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        posts = Post.objects.exclude(image='').filter(
+            image_format=''
+        ).only('pk', 'image').order_by('pk')
+        updated = failed = 0
+        last_pk = 0
+        with ThreadPoolExecutor(options['workers']) as executor:
+            while True:
+                batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                filled = []
+                # Файлы читаются параллельно, в базу пишет один поток.
+                for post, metadata in executor.map(read_metadata, batch):
+                    if not metadata:
+                        failed += 1
+                        self.stderr.write(f'Не прочитана: {post.image.name}')
+                        continue
+                    for field, value in metadata.items():
+                        setattr(post, field, value)
+                    filled.append(post)
+                Post.objects.bulk_update(filled, FIELDS)
+                updated += len(filled)
+                self.stdout.write(f'Обновлено постов: {updated}')
+        self.stdout.write(
+            f'Готово: обновлено {updated}, не прочитано {failed}'
+        )
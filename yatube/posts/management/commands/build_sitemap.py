@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.sitemaps import build_sitemap
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает карту сайта в SITEMAP_ROOT.'
+
+    def handle(self, *args, **options):
+        manifest = build_sitemap()
+        total = sum(shard['count'] for shard in manifest['shards'])
+        self.stdout.write(
+            f'Готово: постов {total}, шардов {len(manifest["shards"])}'
+        )
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from posts.feeds import invalidate_feeds
+from posts.queryplans import check_pages, format_problem, seed
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Проверяет планы запросов главной, создания поста и списка постов '
+        'в админке на большом наборе данных.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=settings.QUERY_PLAN_SEED,
+            help='Сколько постов добавить перед проверкой; 0 — не добавлять.',
+        )
+
+    def handle(self, *args, **options):
+        # Данные для проверки добавляются в транзакции и откатываются.
+        try:
+            with transaction.atomic():
+                user = seed(options['seed'])
+                problems = check_pages(user)
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            # bulk_create не шлёт сигналов: ленты, собранные из
+            # откатанных постов, сбрасываются явно.
+            invalidate_feeds()
+        for problem in problems:
+            self.stderr.write(format_problem(problem))
+        if problems:
+            raise CommandError(f'Плохих планов: {len(problems)}')
+        self.stdout.write('Планы запросов в порядке')
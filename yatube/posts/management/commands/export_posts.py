@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import FORMATS, Throughput, export_lines, parse_columns
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Потоковая выгрузка постов в CSV или JSONL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument(
+            '--columns',
+            help='Колонки через запятую, по умолчанию все.',
+        )
+        parser.add_argument('--group', help='Только посты группы (slug).')
+        parser.add_argument(
+            '--output',
+            default='-',
+            help='Файл для выгрузки, «-» — стандартный вывод.',
+        )
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, **options):
+        try:
+            columns = parse_columns(options['columns'])
+        except ValueError as error:
+            raise CommandError(error)
+        posts = Post.objects.all()
+        if options['group']:
+            posts = posts.filter(group__slug=options['group'])
+        throughput = Throughput()
+        lines = export_lines(
+            posts,
+            columns,
+            options['format'],
+            throughput=throughput,
+            chunk_size=options['chunk_size'],
+        )
+        if options['output'] == '-':
+            for chunk in lines:
+                self.stdout.write(chunk, ending='')
+        else:
+            with open(
+                options['output'], 'w', newline='', encoding='utf-8'
+            ) as output:
+                output.writelines(lines)
+        self.stderr.write(f'Выгружено: {throughput}')
@@ -0,0 +1,145 @@
+import heapq
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.db.models.fields.files import FieldFile
+from sorl.thumbnail import delete
+
+from posts.models import ArchivedPost, MediaFile, Post
+from posts.storage import content_storage
+
+# Сортировка по байтам, как у строк Python, иначе слияние не сработает.
+COLLATIONS = {
+    'sqlite': 'BINARY',
+    'postgresql': '"C"',
+}
+
+
+def model_names(model, prefix):
+    field = model._meta.get_field('image')
+    names = model.objects.filter(
+        image__startswith=f'{prefix}/'
+    ).values_list('image', flat=True).distinct()
+    collation = COLLATIONS.get(connection.vendor)
+    if collation:
+        order = RawSQL(f'{field.column} COLLATE {collation}', [])
+        names = names.order_by(order.asc())
+    else:
+        names = names.order_by('image')
+    previous = ''
+    for name in names.iterator(chunk_size=2000):
+        if name < previous:
+            raise CommandError(
+                'База вернула имена не в байтовом порядке, '
+                'сборка мусора небезопасна.'
+            )
+        previous = name
+        yield name
+
+
+def referenced_names(prefix):
+    """Отсортированные имена картинок постов и архива, потоком."""
+    return heapq.merge(
+        model_names(Post, prefix), model_names(ArchivedPost, prefix)
+    )
+
+
+def stored_files(path, prefix):
+    """Файлы под path в том же порядке, в каком сортируются их имена."""
+    with os.scandir(path) as scanner:
+        entries = sorted(
+            scanner,
+            key=lambda entry: entry.name + (
+                '/' if entry.is_dir(follow_symlinks=False) else ''
+            ),
+        )
+    for entry in entries:
+        name = f'{prefix}/{entry.name}'
+        if entry.is_dir(follow_symlinks=False):
+            yield from stored_files(entry.path, name)
+        else:
+            yield name, entry
+
+
+def is_referenced(name):
+    return (
+        Post.objects.filter(image=name).exists()
+        or ArchivedPost.objects.filter(image=name).exists()
+    )
+
+
+def find_orphans(prefix, root):
+    referenced = referenced_names(prefix)
+    current = next(referenced, None)
+    for name, entry in stored_files(root, prefix):
+        while current is not None and current < name:
+            current = next(referenced, None)
+        if current != name:
+            yield name, entry
+
+
+class Command(BaseCommand):
+    help = 'Удаляет картинки, на которые не ссылается ни один пост.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='posts')
+        parser.add_argument('--dry-run', action='store_true')
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=60 * 60,
+            help='Не трогать файлы моложе стольких секунд.',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=0,
+            help='Не больше стольких удалений в секунду, 0 — без ограничения.',
+        )
+
+    def handle(self, *args, **options):
+        prefix = options['prefix'].strip('/')
+        root = os.path.join(settings.MEDIA_ROOT, prefix)
+        if not os.path.isdir(root):
+            self.stdout.write(f'Нет каталога {root}')
+            return
+        field = Post._meta.get_field('image')
+        deadline = time.time() - options['grace']
+        interval = 1 / options['rate'] if options['rate'] else 0
+        orphans = freed = 0
+
+        for name, entry in find_orphans(prefix, root):
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_mtime > deadline:
+                continue
+            if options['dry_run']:
+                orphans += 1
+                freed += stat.st_size
+                self.stdout.write(f'Сирота: {name}')
+                continue
+            # Под блокировкой хранилища файл мог заново понадобиться
+            # загрузке (она обновляет время изменения) или посту.
+            with content_storage.locked(name):
+                try:
+                    stat = os.stat(entry.path)
+                except FileNotFoundError:
+                    continue
+                if stat.st_mtime > deadline or is_referenced(name):
+                    continue
+                delete(FieldFile(None, field, name), delete_file=False)
+                os.remove(entry.path)
+                MediaFile.objects.filter(name=name).delete()
+            orphans += 1
+            freed += stat.st_size
+            self.stdout.write(f'Удалён: {name}')
+            if interval:
+                time.sleep(interval)
+
+        self.stdout.write(
+            f'Файлов-сирот: {orphans}, освобождено байт: {freed}'
+            + (' (пробный запуск)' if options['dry_run'] else '')
+        )
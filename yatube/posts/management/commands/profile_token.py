@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from yatube.profiler import make_token
+
+
+class Command(BaseCommand):
+    help = (
+        'Печатает подписанный токен для заголовка X-Profile, '
+        'действует PROFILE_TOKEN_MAX_AGE секунд.'
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(make_token())
+        self.stderr.write(
+            f'Действителен {settings.PROFILE_TOKEN_MAX_AGE} с.'
+        )
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import ArchivedPost, Post
+from posts.rendering import RENDERER_VERSION
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает HTML текста постов после смены правил рендера.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересобрать все посты, а не только устаревшие.',
+        )
+
+    def handle(self, *args, **options):
+        rendered = sum(
+            self.render_model(model, options)
+            for model in (Post, ArchivedPost)
+        )
+        self.stdout.write(
+            f'Пересобрано постов: {rendered}, версия {RENDERER_VERSION}'
+        )
+
+    def render_model(self, model, options):
+        posts = model.objects.only('pk', 'text').order_by('pk')
+        if not options['all']:
+            posts = posts.exclude(text_html_version=RENDERER_VERSION)
+        rendered = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_pk)[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            for post in batch:
+                post.render_text()
+            model.objects.bulk_update(
+                batch, ('text_html', 'text_html_version')
+            )
+            rendered += len(batch)
+        return rendered
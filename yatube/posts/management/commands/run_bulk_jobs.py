@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Воркер массовых операций над постами из админки.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить очередь и выйти.',
+        )
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            count = run_pending_jobs()
+            if count:
+                self.stdout.write(f'Выполнено операций: {count}')
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,40 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from yatube.slowqueries import aggregate
+
+
+class Command(BaseCommand):
+    help = 'Сводка журнала медленных запросов по отпечаткам SQL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=settings.SLOW_QUERY_LOG)
+        parser.add_argument('--top', type=int, default=20)
+
+    def read_lines(self, path):
+        # Сначала самые старые файлы ротации: log.5, ..., log.1, log.
+        paths = [
+            f'{path}.{i}'
+            for i in range(settings.SLOW_QUERY_LOG_BACKUPS, 0, -1)
+        ] + [path]
+        for name in paths:
+            if os.path.exists(name):
+                with open(name, encoding='utf-8') as log:
+                    yield from log
+
+    def handle(self, *args, **options):
+        summary = aggregate(self.read_lines(options['log']))
+        for item in summary[:options['top']]:
+            self.stdout.write(
+                f'{item["fingerprint"]}  {item["count"]} раз, '
+                f'всего {item["total_ms"]:.1f} мс, '
+                f'максимум {item["max_ms"]:.1f} мс'
+            )
+            self.stdout.write(f'  {item["sql"]}')
+            for field in ('views', 'templates'):
+                if item[field]:
+                    self.stdout.write(
+                        f'  {field}: {", ".join(sorted(item[field]))}'
+                    )
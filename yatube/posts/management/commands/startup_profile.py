@@ -0,0 +1,93 @@
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+COLD_START = (
+    'import time; started = time.perf_counter(); '
+    'import {target}; print(time.perf_counter() - started)'
+)
+
+
+def parse_importtime(output):
+    """Разбирает вывод -X importtime в {модуль: (self, cumulative)}, мкс."""
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            continue
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+class Command(BaseCommand):
+    help = 'Время импорта модулей и холодного старта приложения.'
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', default='yatube.wsgi')
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Ошибка, если медиана старта больше STARTUP_BUDGET_MS.',
+        )
+
+    def run_python(self, *args):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+        result = subprocess.run(
+            [sys.executable, *args],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr)
+        return result
+
+    def handle(self, *args, **options):
+        target = options['target']
+        modules = parse_importtime(
+            self.run_python('-X', 'importtime', '-c', f'import {target}')
+            .stderr
+        )
+        by_package = {}
+        for name, (self_us, _) in modules.items():
+            package = name.split('.')[0]
+            by_package[package] = by_package.get(package, 0) + self_us
+
+        self.stdout.write(f'Самые долгие модули ({target}), мс:')
+        top = sorted(modules.items(), key=lambda item: -item[1][0])
+        for name, (self_us, cumulative_us) in top[:options['top']]:
+            self.stdout.write(
+                f'{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {name}'
+            )
+        self.stdout.write('По пакетам, мс:')
+        packages = sorted(by_package.items(), key=lambda item: -item[1])
+        for package, self_us in packages[:options['top']]:
+            self.stdout.write(f'{self_us / 1000:9.1f}  {package}')
+
+        timings = [
+            float(self.run_python(
+                '-c', COLD_START.format(target=target)
+            ).stdout) * 1000
+            for _ in range(options['runs'])
+        ]
+        median = statistics.median(timings)
+        self.stdout.write(
+            f'Холодный старт {target}: медиана {median:.1f} мс, '
+            f'минимум {min(timings):.1f} мс, запусков {len(timings)}'
+        )
+        if options['check'] and median > settings.STARTUP_BUDGET_MS:
+            raise CommandError(
+                f'Холодный старт {median:.1f} мс превышает бюджет '
+                f'{settings.STARTUP_BUDGET_MS} мс'
+            )
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 06:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_bulk_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bulkjob',
+            name='action',
+            field=models.CharField(choices=[('reassign_group', 'Сменить группу'), ('delete', 'Удалить с картинками'), ('export', 'Выгрузить в файл')], max_length=20, verbose_name='Действие'),
+        ),
+    ]
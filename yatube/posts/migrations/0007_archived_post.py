@@ -0,0 +1,42 @@
+# Generated by Django 2.2.16 on 2026-10-19 06:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import posts.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0006_bulk_job_export_label'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPost',
+            fields=[
+                ('text', models.TextField(help_text='Текст нового поста', verbose_name='Текст поста')),
+                ('text_html', models.TextField(blank=True, editable=False, verbose_name='HTML текста')),
+                ('text_html_version', models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Версия HTML текста')),
+                ('image', models.ImageField(blank=True, storage=posts.storage.ContentAddressedStorage(), upload_to='posts/', verbose_name='Картинка')),
+                ('image_width', models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина картинки')),
+                ('image_height', models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота картинки')),
+                ('image_size', models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Размер картинки')),
+                ('image_format', models.CharField(blank=True, editable=False, max_length=10, verbose_name='Формат картинки')),
+                ('image_color', models.CharField(blank=True, editable=False, max_length=7, verbose_name='Цвет-заглушка картинки')),
+                ('id', models.IntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(db_index=True, verbose_name='Дата публикации')),
+                ('archived', models.DateTimeField(auto_now_add=True, verbose_name='Перенесён в архив')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_posts', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_posts', to='posts.Group', verbose_name='Группа')),
+            ],
+            options={
+                'verbose_name': 'Архивный пост',
+                'verbose_name_plural': 'Архивные посты',
+                'ordering': ('-pub_date',),
+                'abstract': False,
+            },
+        ),
+    ]
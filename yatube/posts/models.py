@@ -1,11 +1,24 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.urls import reverse
+
+from .images import image_metadata
+from .rendering import RENDERER_VERSION, render_text
+from .storage import content_storage
 
 
 User = get_user_model()
 
 
+def post_surrogate_key(post_id):
+    return f'post-{post_id}'
+
+
+def group_surrogate_key(slug):
+    return f'group-{slug}'
+
+
 class Group(models.Model):
     title = models.CharField(
         max_length=200,
@@ -29,16 +42,93 @@ class Group(models.Model):
         return self.title
 
 
-class Post(models.Model):
+class BasePost(models.Model):
     text = models.TextField(
         help_text='Текст нового поста',
         verbose_name='Текст поста',
     )
+    # Готовый HTML текста, чтобы не прогонять linebreaksbr на каждом
+    # выводе карточки.
+    text_html = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='HTML текста'
+    )
+    text_html_version = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия HTML текста'
+    )
     pub_date = models.DateTimeField(
         auto_now_add=True,
         db_index=True,
         verbose_name='Дата публикации'
     )
+    image = models.ImageField(
+        upload_to='posts/',
+        storage=content_storage,
+        blank=True,
+        verbose_name='Картинка',
+    )
+    # Метаданные картинки заполняются при загрузке, чтобы выводить
+    # карточку без чтения файла.
+    image_width = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Ширина картинки'
+    )
+    image_height = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Высота картинки'
+    )
+    image_size = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Размер картинки'
+    )
+    image_format = models.CharField(
+        max_length=10,
+        blank=True,
+        editable=False,
+        verbose_name='Формат картинки'
+    )
+    image_color = models.CharField(
+        max_length=7,
+        blank=True,
+        editable=False,
+        verbose_name='Цвет-заглушка картинки'
+    )
+
+    class Meta:
+        abstract = True
+        ordering = ('-pub_date',)
+
+    def __str__(self):
+        return self.text[:settings.CHARS_LENGTH]
+
+    def get_absolute_url(self):
+        return reverse('posts:post_detail', kwargs={'post_id': self.pk})
+
+    def save(self, *args, **kwargs):
+        self.render_text()
+        if self.image and not self.image._committed:
+            self.fill_image_metadata()
+        super().save(*args, **kwargs)
+
+    def render_text(self):
+        self.text_html = render_text(self.text)
+        self.text_html_version = RENDERER_VERSION
+
+    def fill_image_metadata(self):
+        for field, value in image_metadata(self.image).items():
+            setattr(self, field, value)
+
+
+class Post(BasePost):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -54,16 +144,153 @@ class Post(models.Model):
         help_text='Группа, к которой будет относиться пост',
         verbose_name='Группа'
     )
-    image = models.ImageField(
-        upload_to='posts/',
+
+    class Meta(BasePost.Meta):
+        verbose_name = 'Пост'
+        verbose_name_plural = 'Посты'
+
+
+class ArchivedPost(BasePost):
+    """Старые посты, перенесённые командой archive_posts; id сохраняются."""
+    id = models.IntegerField(
+        primary_key=True,
+        verbose_name='ID'
+    )
+    pub_date = models.DateTimeField(
+        db_index=True,
+        verbose_name='Дата публикации'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        verbose_name='Автор'
+    )
+    group = models.ForeignKey(
+        Group,
         blank=True,
-        verbose_name='Картинка',
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+        verbose_name='Группа'
+    )
+    archived = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Перенесён в архив'
+    )
+
+    class Meta(BasePost.Meta):
+        verbose_name = 'Архивный пост'
+        verbose_name_plural = 'Архивные посты'
+
+
+def get_post(post_id):
+    """Пост по id из основной таблицы или, если его там нет, из архива."""
+    for model in (Post, ArchivedPost):
+        post = model.objects.select_related('author', 'group').filter(
+            pk=post_id
+        ).first()
+        if post is not None:
+            return post
+    return None
+
+
+class MediaFile(models.Model):
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Путь'
+    )
+    size = models.PositiveIntegerField(
+        verbose_name='Размер'
+    )
+    refcount = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число ссылок'
     )
 
     class Meta:
-        verbose_name = 'Пост'
-        verbose_name_plural = 'Посты'
-        ordering = ('-pub_date',)
+        verbose_name = 'Медиафайл'
+        verbose_name_plural = 'Медиафайлы'
 
     def __str__(self):
-        return self.text[:settings.CHARS_LENGTH]
+        return self.name
+
+
+class BulkJob(models.Model):
+    REASSIGN_GROUP = 'reassign_group'
+    DELETE = 'delete'
+    EXPORT = 'export'
+    ACTIONS = (
+        (REASSIGN_GROUP, 'Сменить группу'),
+        (DELETE, 'Удалить с картинками'),
+        (EXPORT, 'Выгрузить в файл'),
+    )
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    action = models.CharField(
+        max_length=20,
+        choices=ACTIONS,
+        verbose_name='Действие'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+        db_index=True,
+        verbose_name='Статус'
+    )
+    # JSON: параметры действия и id выбранных постов.
+    params = models.TextField(
+        default='{}',
+        verbose_name='Параметры'
+    )
+    post_ids = models.TextField(
+        verbose_name='Посты'
+    )
+    total = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Всего'
+    )
+    processed = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Обработано'
+    )
+    result = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name='Результат'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создано'
+    )
+    finished = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Завершено'
+    )
+    created_by = models.ForeignKey(
+        User,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='bulk_jobs',
+        verbose_name='Автор'
+    )
+
+    class Meta:
+        verbose_name = 'Массовая операция'
+        verbose_name_plural = 'Массовые операции'
+        ordering = ('-created',)
+
+    def __str__(self):
+        return f'{self.get_action_display()} ({self.total})'
@@ -0,0 +1,155 @@
+"""
+Проверка планов запросов ключевых страниц.
+
+Страницы открываются тестовым клиентом от суперпользователя, каждый
+SELECT прогоняется через EXPLAIN той базы, куда он ушёл. Плохим считается
+план с полным проходом по большой таблице или с сортировкой во временной
+структуре для запроса к ней. Используется командой check_query_plans и
+фикстурой query_plans в тестах.
+
+Страницы выводятся без кэша фрагмента главной: из тёплого кэша запрос
+ленты не выполнился бы и не попал бы в EXPLAIN, а фрагмент из
+откатываемых постов остался бы в общем кэше для живых воркеров.
+"""
+import json
+import re
+from collections import namedtuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Group, Post
+
+User = get_user_model()
+
+PAGES = (
+    'posts:index',
+    'posts:post_create',
+    'admin:posts_post_changelist',
+)
+
+Problem = namedtuple('Problem', 'url sql plan reason')
+
+SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+SQLITE_TEMP_SORT = re.compile(r'USE TEMP B-TREE FOR (?:ORDER|GROUP) BY')
+
+
+def used_connections():
+    """Базы, куда могут уйти запросы страниц: основная и реплики."""
+    aliases = ['default', *settings.REPLICA_DATABASES]
+    return [connections[alias] for alias in aliases]
+
+
+def seed(count, batch_size=1000):
+    """Заполняет базу count постами и возвращает суперпользователя."""
+    user = User.objects.create_superuser(
+        'query-plans', 'query-plans@example.com', None
+    )
+    group = Group.objects.create(
+        title='Планы запросов', slug='query-plans', description='-'
+    )
+    for start in range(0, count, batch_size):
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=user, group=group)
+            for i in range(start, min(start + batch_size, count))
+        )
+    for connection in used_connections():
+        if connection.vendor in ('sqlite', 'postgresql'):
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+    return user
+
+
+def capture(client, url):
+    """Все SELECT, выполненные при открытии url, по базам."""
+    contexts = [
+        CaptureQueriesContext(connection) for connection in used_connections()
+    ]
+    for context in contexts:
+        context.__enter__()
+    try:
+        client.get(url)
+    finally:
+        for context in reversed(contexts):
+            context.__exit__(None, None, None)
+    return [
+        (context.connection, query['sql'])
+        for context in contexts
+        for query in context.captured_queries
+        if query['sql'].lstrip().upper().startswith('SELECT')
+    ]
+
+
+def explain(connection, sql):
+    """План запроса: строки для sqlite, JSON-дерево для Postgres."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return plan[0]['Plan']
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from plan_nodes(child)
+
+
+def find_problems(vendor, sql, plan, tables):
+    """Причины, по которым план не годится; пустой список — план хороший."""
+    touches_large = any(f'"{table}"' in sql for table in tables)
+    problems = []
+    if vendor == 'postgresql':
+        for node in plan_nodes(plan):
+            if (
+                node['Node Type'] == 'Seq Scan'
+                and node.get('Relation Name') in tables
+            ):
+                problems.append(
+                    f'последовательное чтение {node["Relation Name"]}'
+                )
+            elif node['Node Type'] == 'Sort' and touches_large:
+                problems.append('сортировка во временной области')
+        return problems
+    for line in plan:
+        match = SQLITE_SCAN.match(line)
+        if match and match.group(1) in tables:
+            problems.append(f'последовательное чтение {match.group(1)}')
+        elif SQLITE_TEMP_SORT.search(line) and touches_large:
+            problems.append('сортировка во временной области')
+    return problems
+
+
+def check_pages(user, pages=PAGES, tables=None):
+    """Открывает страницы от имени user и возвращает список Problem."""
+    if tables is None:
+        tables = settings.QUERY_PLAN_TABLES
+    client = Client()
+    client.force_login(user)
+    problems = []
+    with override_settings(INDEX_CACHE_TIMEOUT=0):
+        for name in pages:
+            url = reverse(name)
+            for connection, sql in capture(client, url):
+                plan = explain(connection, sql)
+                for reason in find_problems(
+                    connection.vendor, sql, plan, tables
+                ):
+                    problems.append(Problem(url, sql, plan, reason))
+    return problems
+
+
+def format_problem(problem):
+    return (
+        f'{problem.url}: {problem.reason}\n'
+        f'  {problem.sql}\n'
+        f'  {problem.plan}'
+    )
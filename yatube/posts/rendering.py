@@ -0,0 +1,9 @@
+from django.template.defaultfilters import linebreaksbr
+
+# Увеличивайте при изменении правил, затем запускайте render_posts.
+RENDERER_VERSION = 1
+
+
+def render_text(text):
+    """HTML текста поста: экранирование и переносы строк в <br>."""
+    return linebreaksbr(text, autoescape=True)
@@ -0,0 +1,100 @@
+import contextvars
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from yatube.surrogate import purge
+
+from .models import (
+    ArchivedPost,
+    Group,
+    Post,
+    group_surrogate_key,
+    post_surrogate_key,
+)
+
+
+_batched = contextvars.ContextVar('posts_signals_batched', default=False)
+
+
+@contextmanager
+def batched():
+    """
+    Удаление постов без работы обработчиков на каждый пост.
+
+    Вызывающий сам снимает ссылки на картинки, сбрасывает ленты и прокси
+    для всей пачки.
+    """
+    token = _batched.set(True)
+    try:
+        yield
+    finally:
+        _batched.reset(token)
+
+
+def release_image(image):
+    """Снимает ссылку на картинку; последняя ссылка уносит и миниатюры."""
+    storage, name = image.storage, image.name
+    storage.delete(name)
+    if not storage.exists(name):
+        from sorl.thumbnail import delete
+
+        delete(image, delete_file=False)
+
+
+# feeds импортируется внутри обработчиков: syndication не нужен при
+# старте manage.py и воркера. Кэши лент на сервере сбрасываются после
+# коммита и раньше прокси, иначе прокси заберёт старую ленту заново.
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, **kwargs):
+    from .feeds import FEED_SURROGATE_KEY, invalidate_feeds
+
+    transaction.on_commit(invalidate_feeds)
+    purge(FEED_SURROGATE_KEY, post_surrogate_key(instance.pk))
+    if created:
+        from .sitemaps import update_after_commit
+
+        transaction.on_commit(update_after_commit)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    if _batched.get():
+        return
+    from .feeds import FEED_SURROGATE_KEY, invalidate_feeds
+
+    transaction.on_commit(invalidate_feeds)
+    purge(FEED_SURROGATE_KEY, post_surrogate_key(instance.pk))
+    if instance.image:
+        image = instance.image
+        transaction.on_commit(lambda: release_image(image))
+
+
+@receiver(post_delete, sender=ArchivedPost)
+def archived_post_deleted(sender, instance, **kwargs):
+    purge(post_surrogate_key(instance.pk))
+    if instance.image:
+        image = instance.image
+        transaction.on_commit(lambda: release_image(image))
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, **kwargs):
+    from .feeds import invalidate_feeds
+    from .sitemaps import update_after_commit, update_groups
+
+    transaction.on_commit(invalidate_feeds)
+    purge(group_surrogate_key(instance.slug))
+    transaction.on_commit(lambda: update_after_commit(update_groups))
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    from .feeds import invalidate_feeds
+    from .sitemaps import update_after_commit, update_groups
+
+    transaction.on_commit(invalidate_feeds)
+    purge(group_surrogate_key(instance.slug))
+    transaction.on_commit(lambda: update_after_commit(update_groups))
@@ -0,0 +1,242 @@
+"""
+Карта сайта, заранее записанная на диск.
+
+build_sitemap() проходит посты (и архивные, у них те же адреса) по
+возрастанию id ключевой пагинацией и пишет их в файлы-шарды по
+SITEMAP_SHARD_SIZE адресов, группы — в отдельный файл, и индекс
+sitemap.xml со ссылками на все файлы. Файлы лежат в SITEMAP_ROOT и
+раздаются как статика по SITEMAP_URL.
+
+Новый пост попадает только в последний шард: update_newest_shard()
+дописывает посты с id больше последнего записанного на место
+закрывающего </urlset>, не перечитывая шард, и при переполнении начинает
+следующий. Остальные файлы не трогаются до полной пересборки командой
+build_sitemap. Новые файлы пишутся во временный файл с заменой,
+параллельные обновления из разных воркеров разводит flock. Если шард
+оборвался посреди дозаписи, его восстановит только build_sitemap.
+"""
+import fcntl
+import heapq
+import json
+import logging
+import os
+from contextlib import contextmanager
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.urls import reverse
+
+from .models import ArchivedPost, Group, Post
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = 'sitemap.xml'
+GROUPS_NAME = 'sitemap-groups.xml'
+MANIFEST_NAME = 'manifest.json'
+URLSET_OPEN = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+URLSET_CLOSE = '</urlset>\n'
+
+
+def shard_name(number):
+    return f'sitemap-posts-{number:04d}.xml'
+
+
+def absolute(path):
+    return settings.SITEMAP_BASE_URL.rstrip('/') + path
+
+
+def url_entry(path, lastmod=None):
+    entry = f'<url><loc>{escape(absolute(path))}</loc>'
+    if lastmod is not None:
+        entry += f'<lastmod>{lastmod.date().isoformat()}</lastmod>'
+    return entry + '</url>\n'
+
+
+def keyset(model, after_id, chunk_size):
+    last_id = after_id
+    while True:
+        rows = list(
+            model.objects.filter(pk__gt=last_id)
+            .order_by('pk')
+            .values_list('pk', 'pub_date')[:chunk_size]
+        )
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1][0]
+
+
+def iter_posts(after_id=0, chunk_size=None, archived=True):
+    """Пары (id, pub_date) постов по возрастанию id."""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    sources = [keyset(Post, after_id, chunk_size)]
+    if archived:
+        sources.append(keyset(ArchivedPost, after_id, chunk_size))
+    return heapq.merge(*sources)
+
+
+def write_file(name, content):
+    path = os.path.join(settings.SITEMAP_ROOT, name)
+    with open(f'{path}.tmp', 'w', encoding='utf-8') as file_:
+        if isinstance(content, str):
+            file_.write(content)
+        else:
+            file_.writelines(content)
+    os.replace(f'{path}.tmp', path)
+
+
+@contextmanager
+def locked():
+    os.makedirs(settings.SITEMAP_ROOT, exist_ok=True)
+    with open(os.path.join(settings.SITEMAP_ROOT, '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def read_manifest():
+    try:
+        with open(
+            os.path.join(settings.SITEMAP_ROOT, MANIFEST_NAME),
+            encoding='utf-8',
+        ) as file_:
+            return json.load(file_)
+    except FileNotFoundError:
+        return None
+
+
+def write_index(manifest):
+    base = settings.SITEMAP_URL
+    names = [GROUPS_NAME] + [shard['name'] for shard in manifest['shards']]
+    write_file(INDEX_NAME, [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<sitemapindex '
+        'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n',
+        *(
+            f'<sitemap><loc>{escape(absolute(base + name))}</loc>'
+            '</sitemap>\n'
+            for name in names
+        ),
+        '</sitemapindex>\n',
+    ])
+    write_file(MANIFEST_NAME, json.dumps(manifest))
+
+
+def write_groups():
+    # Отдельной страницы у группы нет, её адрес — лента группы.
+    write_file(GROUPS_NAME, [
+        URLSET_OPEN,
+        *(
+            url_entry(reverse('posts:group_feed_rss', args=(slug,)))
+            for slug in Group.objects.order_by('pk')
+            .values_list('slug', flat=True)
+            .iterator()
+        ),
+        URLSET_CLOSE,
+    ])
+
+
+def shard_path(shard):
+    return os.path.join(settings.SITEMAP_ROOT, shard['name'])
+
+
+def open_shard(shard):
+    file_ = open(f'{shard_path(shard)}.tmp', 'w', encoding='utf-8')
+    file_.write(URLSET_OPEN)
+    return file_
+
+
+def reopen_shard(shard):
+    """Открывает записанный шард на дозапись вместо </urlset>."""
+    path = shard_path(shard)
+    close = URLSET_CLOSE.encode()
+    with open(path, 'r+b') as file_:
+        file_.seek(-len(close), os.SEEK_END)
+        if file_.read() != close:
+            raise ValueError(f'Шард {path} оборван, нужен build_sitemap')
+        file_.seek(-len(close), os.SEEK_END)
+        file_.truncate()
+    return open(path, 'a', encoding='utf-8')
+
+
+def close_shard(shard, file_):
+    file_.write(URLSET_CLOSE)
+    file_.close()
+    if os.path.exists(f'{shard_path(shard)}.tmp'):
+        os.replace(f'{shard_path(shard)}.tmp', shard_path(shard))
+
+
+def write_shards(rows, shards):
+    """Потоком дописывает rows в шарды из списка shards."""
+    size = settings.SITEMAP_SHARD_SIZE
+    shard = shards[-1] if shards and shards[-1]['count'] < size else None
+    file_ = None
+    for pk, pub_date in rows:
+        if file_ is None and shard is not None and shard['count'] < size:
+            file_ = reopen_shard(shard)
+        if shard is None or shard['count'] >= size:
+            if file_ is not None:
+                close_shard(shard, file_)
+            shard = {
+                'name': shard_name(len(shards) + 1),
+                'first_id': pk,
+                'count': 0,
+            }
+            shards.append(shard)
+            file_ = open_shard(shard)
+        file_.write(url_entry(
+            reverse('posts:post_detail', args=(pk,)), pub_date
+        ))
+        shard['last_id'] = pk
+        shard['count'] += 1
+    if file_ is not None:
+        close_shard(shard, file_)
+
+
+def build_sitemap():
+    """Полностью пересобирает карту сайта; возвращает манифест."""
+    with locked():
+        write_groups()
+        shards = []
+        write_shards(iter_posts(), shards)
+        manifest = {'shards': shards}
+        write_index(manifest)
+        names = {shard['name'] for shard in shards}
+        for name in os.listdir(settings.SITEMAP_ROOT):
+            if name.startswith('sitemap-posts-') and name not in names:
+                os.remove(os.path.join(settings.SITEMAP_ROOT, name))
+    return manifest
+
+
+def update_newest_shard():
+    """Дописывает новые посты в последний шард, не трогая остальные."""
+    with locked():
+        manifest = read_manifest()
+        if manifest is None:
+            return
+        shards = manifest['shards']
+        last_id = shards[-1]['last_id'] if shards else 0
+        rows = list(iter_posts(last_id, archived=False))
+        if not rows:
+            return
+        write_shards(rows, shards)
+        write_index(manifest)
+
+
+def update_groups():
+    """Переписывает файл групп, если карта сайта уже собрана."""
+    with locked():
+        if read_manifest() is not None:
+            write_groups()
+
+
+def update_after_commit(update=update_newest_shard):
+    try:
+        update()
+    except (OSError, ValueError):
+        logger.exception('Не удалось обновить карту сайта')
@@ -0,0 +1,118 @@
+"""
+Хранилище картинок по хэшу содержимого.
+
+Файл сохраняется как posts/ab/cd/abcd…​.gif, где abcd… — sha256
+содержимого. Одинаковые загрузки получают одно имя и один файл на
+диске, а значит и общие миниатюры sorl. Число ссылок на файл хранится
+в MediaFile, файл удаляется вместе с последней ссылкой.
+
+Проверка файла со ссылкой при сохранении и снятие ссылки с удалением
+файла идут под блокировкой имени (flock, общий для воркеров и
+gc_media), так что одновременная загрузка того же файла не получит
+ссылку на только что удалённый.
+"""
+import fcntl
+import hashlib
+import os
+import uuid
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+SHARD_DEPTH = 2
+SHARD_WIDTH = 2
+LOCK_DIR = '.locks'
+# Блокировки по первым символам хэша имени: 256 файлов на всё хранилище.
+LOCK_WIDTH = 2
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_name(name, digest):
+    directory, filename = os.path.split(name)
+    ext = os.path.splitext(filename)[1].lower()
+    shards = [
+        digest[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH]
+        for i in range(SHARD_DEPTH)
+    ]
+    return '/'.join(filter(None, [directory, *shards, digest + ext]))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def get_media_files(self):
+        return apps.get_model('posts', 'MediaFile').objects
+
+    def get_available_name(self, name, max_length=None):
+        # Имя определяется содержимым и выбирается в _save().
+        return name
+
+    @contextmanager
+    def locked(self, name):
+        """Блокировка имени name, общая для всех процессов."""
+        lock_dir = self.path(LOCK_DIR)
+        os.makedirs(lock_dir, exist_ok=True)
+        stripe = hashlib.sha1(name.encode()).hexdigest()[:LOCK_WIDTH]
+        with open(os.path.join(lock_dir, stripe), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _save(self, name, content):
+        name = content_name(name, content_hash(content))
+        with self.locked(name):
+            if self.exists(name):
+                # Свежее время изменения защищает файл от gc_media, пока
+                # пост с ним ещё не сохранён.
+                os.utime(self.path(name))
+            else:
+                directory, filename = os.path.split(name)
+                temp_name = super()._save(
+                    f'{directory}/.tmp-{uuid.uuid4().hex}-{filename}',
+                    content,
+                )
+                try:
+                    os.link(self.path(temp_name), self.path(name))
+                finally:
+                    os.remove(self.path(temp_name))
+            self.add_reference(name, content.size)
+        return name
+
+    def add_reference(self, name, size):
+        media_files = self.get_media_files()
+        updated = media_files.filter(name=name).update(
+            refcount=F('refcount') + 1
+        )
+        if updated:
+            return
+        try:
+            with transaction.atomic():
+                media_files.create(name=name, size=size, refcount=1)
+        except IntegrityError:
+            media_files.filter(name=name).update(refcount=F('refcount') + 1)
+
+    def delete(self, name):
+        """Снимает ссылку и удаляет файл, если ссылок не осталось."""
+        media_files = self.get_media_files()
+        with self.locked(name):
+            media_files.filter(name=name, refcount__gt=0).update(
+                refcount=F('refcount') - 1
+            )
+            if media_files.filter(name=name, refcount__gt=0).exists():
+                return
+            media_files.filter(name=name).delete()
+            super().delete(name)
+
+
+content_storage = ContentAddressedStorage()
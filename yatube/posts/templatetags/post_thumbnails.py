@@ -0,0 +1,12 @@
+from django import template
+
+from ..thumbnails import prefetch_thumbnails as prefetch
+
+register = template.Library()
+
+
+@register.simple_tag
+def prefetch_thumbnails(posts, geometry_string, **options):
+    """Загружает миниатюры картинок постов страницы одним запросом."""
+    prefetch((post.image for post in posts), geometry_string, **options)
+    return ''
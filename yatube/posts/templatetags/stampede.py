@@ -0,0 +1,52 @@
+from django import template
+from django.core.cache.utils import make_template_fragment_key
+from django.utils.safestring import mark_safe
+
+from yatube.stampede import get_or_compute
+
+register = template.Library()
+
+
+class StampedeCacheNode(template.Node):
+    def __init__(self, nodelist, timeout, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        timeout = self.timeout.resolve(context)
+        if not timeout:
+            return self.nodelist.render(context)
+        key = make_template_fragment_key(
+            self.fragment_name,
+            [var.resolve(context) for var in self.vary_on],
+        )
+        return mark_safe(get_or_compute(
+            key, lambda: self.nodelist.render(context), int(timeout)
+        ))
+
+
+@register.tag
+def stampede_cache(parser, token):
+    """
+    Как {% cache %}, но без одновременных пересчётов фрагмента.
+
+        {% stampede_cache timeout name [vary_on ...] %} ...
+        {% endstampede_cache %}
+
+    При timeout, равном 0 или None, фрагмент не кэшируется.
+    """
+    nodelist = parser.parse(('endstampede_cache',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{tokens[0]}' tag requires at least 2 arguments."
+        )
+    return StampedeCacheNode(
+        nodelist,
+        parser.compile_filter(tokens[1]),
+        tokens[2],
+        [parser.compile_filter(token) for token in tokens[3:]],
+    )
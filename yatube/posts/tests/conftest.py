@@ -0,0 +1,35 @@
+import pytest
+from django.conf import settings
+
+from ..queryplans import check_pages, seed
+from . import factories
+
+
+@pytest.fixture
+def user_factory(db):
+    """Создаёт пользователей с уникальными именами."""
+    return factories.create_user
+
+
+@pytest.fixture
+def group_factory(db):
+    """Создаёт группы с уникальными slug."""
+    return factories.create_group
+
+
+@pytest.fixture
+def post_factory(db):
+    """Создаёт посты; автор по умолчанию — новый пользователь."""
+    return factories.create_post
+
+
+@pytest.fixture
+def query_plans(db):
+    """Засевает базу постами и возвращает проверку планов страниц."""
+    user = seed(settings.QUERY_PLAN_SEED)
+
+    def check(pages=None, **kwargs):
+        if pages is not None:
+            kwargs['pages'] = pages
+        return check_pages(user, **kwargs)
+    return check
@@ -0,0 +1,66 @@
+"""
+Общие фабрики тестовых данных.
+
+TestCase вызывает их напрямую, pytest-тесты получают через фикстуры
+из conftest.py. Картинки сохраняются в MEDIA_ROOT из settings_test —
+временную папку своего процесса; clear_media() чистит её после класса.
+"""
+import itertools
+import shutil
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+_numbers = itertools.count()
+
+
+def create_user(**kwargs):
+    """Пользователь с уникальным именем."""
+    kwargs.setdefault('username', f'user{next(_numbers)}')
+    return User.objects.create_user(**kwargs)
+
+
+def create_admin(**kwargs):
+    return create_user(is_staff=True, is_superuser=True, **kwargs)
+
+
+def create_group(**kwargs):
+    """Группа с уникальным slug."""
+    number = next(_numbers)
+    kwargs.setdefault('title', f'Группа {number}')
+    kwargs.setdefault('slug', f'group-{number}')
+    kwargs.setdefault('description', 'Тестовое описание')
+    return Group.objects.create(**kwargs)
+
+
+def create_post(**kwargs):
+    """Пост; автор по умолчанию — новый пользователь."""
+    if 'author' not in kwargs:
+        kwargs['author'] = create_user()
+    kwargs.setdefault('text', 'Тестовый пост')
+    return Post.objects.create(**kwargs)
+
+
+def small_gif(name='small.gif', tail=b''):
+    """Загруженная картинка 2x1; tail делает содержимое уникальным."""
+    return SimpleUploadedFile(
+        name=name, content=SMALL_GIF + tail, content_type='image/gif'
+    )
+
+
+def clear_media():
+    shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
@@ -0,0 +1,183 @@
+import os
+from http import HTTPStatus
+from unittest import mock
+
+from django.core.paginator import EmptyPage
+from django.db import connection
+from django.core.cache import cache
+from django.test import (
+    Client,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..admin import LargeTablePaginator, PostAdmin, parse_cursor
+from ..jobs import enqueue, run_pending_jobs
+from ..models import BulkJob, Post
+from .factories import create_admin, create_group, create_user
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = create_admin()
+        cls.group = create_group(slug='test-slug')
+        Post.objects.bulk_create(
+            Post(text=f'Пост #{i}', author=cls.admin, group=cls.group)
+            for i in range(25)
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def test_numbered_pages_match_slices(self):
+        """Страницы по номеру совпадают со срезами списка."""
+        posts = Post.objects.order_by('-pub_date', '-pk')
+        paginator = LargeTablePaginator(posts, 10)
+        for number in (1, 2, 3):
+            with self.subTest(number=number):
+                self.assertEqual(
+                    list(paginator.page(number).object_list),
+                    list(posts[(number - 1) * 10:number * 10]),
+                )
+
+    @override_settings(ADMIN_COUNT_LIMIT=20)
+    def test_count_is_capped(self):
+        self.assertEqual(
+            LargeTablePaginator(Post.objects.all(), 10).count, 20
+        )
+
+    @override_settings(ADMIN_COUNT_LIMIT=15)
+    def test_pages_past_estimate_valid(self):
+        """Страницы дальше оценки числа строк открываются, пустые — нет."""
+        posts = Post.objects.order_by('-pub_date', '-pk')
+        paginator = LargeTablePaginator(posts, 10)
+        self.assertTrue(paginator.count_capped)
+        self.assertEqual(
+            list(paginator.page(3).object_list), list(posts[20:])
+        )
+        with self.assertRaises(EmptyPage):
+            paginator.page(4)
+
+    def test_cursor_page_without_offset(self):
+        """Страница по курсору совпадает со следующей и читается без OFFSET."""
+        posts = Post.objects.order_by('-pub_date', '-pk')
+        first = LargeTablePaginator(posts, 10)
+        first.page(1)
+        paginator = LargeTablePaginator(
+            posts, 10, cursor=parse_cursor(first.next_cursor)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            page = paginator.page(1)
+        self.assertEqual(list(page.object_list), list(posts[10:20]))
+        self.assertNotIn('OFFSET', queries[0]['sql'])
+
+    @override_settings(ADMIN_COUNT_LIMIT=15)
+    def test_changelist_pages_past_estimate(self):
+        """Список в админке листается за оценку: по номеру и по курсору."""
+        url = reverse('admin:posts_post_changelist')
+        with mock.patch.object(PostAdmin, 'list_per_page', 10):
+            response = self.client.get(url, {'p': 2})
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            self.assertEqual(len(response.context['cl'].result_list), 5)
+            self.assertContains(response, 'больше 15')
+            response = self.client.get(url)
+            next_url = response.context['cl'].next_page_url()
+            self.assertIn('after=', next_url)
+            response = self.client.get(url + next_url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(
+            list(response.context['cl'].result_list),
+            list(Post.objects.order_by('-pub_date', '-pk')[10:20]),
+        )
+
+    def test_changelist(self):
+        """Список постов: автодополнение вместо select и без COUNT(*)."""
+        url = reverse('admin:posts_post_changelist')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIsNone(response.context['cl'].full_result_count)
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertEqual(len(response.context['cl'].result_list), 25)
+
+
+@override_settings(BULK_JOB_CHUNK_SIZE=4)
+class BulkActionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = create_admin()
+        cls.group = create_group(slug='test-slug')
+        Post.objects.bulk_create(
+            Post(text=f'Пост #{i}', author=cls.admin) for i in range(10)
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def run_action(self, action, **data):
+        ids = list(Post.objects.values_list('pk', flat=True)[:9])
+        response = self.client.post(
+            reverse('admin:posts_post_changelist'),
+            {'action': action, '_selected_action': ids, **data},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        self.assertEqual(run_pending_jobs(), 1)
+        return BulkJob.objects.get()
+
+    def test_reassign_group(self):
+        job = self.run_action('reassign_group', group='test-slug')
+        self.assertEqual(job.status, BulkJob.DONE)
+        self.assertEqual((job.processed, job.total), (9, 9))
+        self.assertEqual(Post.objects.filter(group=self.group).count(), 9)
+
+    def test_delete(self):
+        job = self.run_action('delete_with_media')
+        self.assertEqual(job.status, BulkJob.DONE)
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_export(self):
+        job = self.run_action('export_file', columns='id,text')
+        self.assertEqual(job.status, BulkJob.DONE)
+        with open(job.result, encoding='utf-8') as output:
+            self.assertEqual(len(output.readlines()), 10)
+        os.remove(job.result)
+
+    def test_standard_delete_disabled(self):
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        self.assertNotContains(response, 'delete_selected')
+
+
+@override_settings(BULK_JOB_CHUNK_SIZE=4)
+class BulkJobFeedTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user()
+        self.group = create_group(slug='test-slug')
+        Post.objects.bulk_create(
+            Post(text=f'Пост #{i}', author=self.user) for i in range(6)
+        )
+        self.client = Client()
+
+    def test_reassign_rebuilds_group_feed(self):
+        """После смены группы лента группы собирается заново."""
+        url = reverse('posts:group_feed_rss', kwargs={'slug': 'test-slug'})
+        self.assertNotContains(self.client.get(url), 'Пост #')
+        enqueue(BulkJob.REASSIGN_GROUP, Post.objects.all(), group='test-slug')
+        run_pending_jobs()
+        self.assertContains(self.client.get(url), 'Пост #')
+
+    def test_delete_rebuilds_feed(self):
+        """После массового удаления лента собирается заново."""
+        url = reverse('posts:feed_rss')
+        self.assertContains(self.client.get(url), 'Пост #')
+        enqueue(BulkJob.DELETE, Post.objects.all())
+        run_pending_jobs()
+        self.assertFalse(Post.objects.exists())
+        self.assertNotContains(self.client.get(url), 'Пост #')
@@ -0,0 +1,46 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import ArchivedPost, Post
+
+User = get_user_model()
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.old_post = Post.objects.create(text='Старый пост', author=cls.user)
+        cls.new_post = Post.objects.create(text='Новый пост', author=cls.user)
+        cls.old_date = timezone.now() - timedelta(days=400)
+        Post.objects.filter(pk=cls.old_post.pk).update(pub_date=cls.old_date)
+
+    def test_old_posts_moved_to_archive(self):
+        """Старые посты переезжают в архив с тем же id и датой."""
+        call_command('archive_posts', '--batch-size', '1', stdout=StringIO())
+        self.assertFalse(Post.objects.filter(pk=self.old_post.pk).exists())
+        self.assertTrue(Post.objects.filter(pk=self.new_post.pk).exists())
+        archived = ArchivedPost.objects.get(pk=self.old_post.pk)
+        self.assertEqual(archived.text, 'Старый пост')
+        self.assertEqual(archived.pub_date, self.old_date)
+        self.assertEqual(archived.author, self.user)
+
+    def test_archived_post_reachable_by_id(self):
+        call_command('archive_posts', stdout=StringIO())
+        client = Client()
+        for post in (self.old_post, self.new_post):
+            with self.subTest(post=post):
+                response = client.get(
+                    reverse('posts:post_detail', args=(post.pk,))
+                )
+                self.assertContains(response, post.text)
+        response = client.get(reverse('posts:post_detail', args=(0,)))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
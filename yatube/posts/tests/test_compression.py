@@ -0,0 +1,100 @@
+import gzip
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from yatube import compression
+from yatube.compression import (
+    CompressionMiddleware,
+    choose_encoding,
+    mark_cached,
+)
+
+BODY = b'<p>' + b'yatube ' * 200 + b'</p>'
+
+
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        cache.clear()
+
+    def process(self, response, accept='gzip'):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING=accept)
+        middleware = CompressionMiddleware(lambda request: response)
+        return middleware(request)
+
+    def test_choose_encoding(self):
+        """Выбор кодировки учитывает q-значения и доступность brotli."""
+        cases = {
+            'gzip': 'gzip',
+            'gzip;q=0': None,
+            '': None,
+            'identity': None,
+            '*': compression.supported_encodings()[0],
+        }
+        for accept, expected in cases.items():
+            with self.subTest(accept=accept):
+                self.assertEqual(choose_encoding(accept), expected)
+        with mock.patch.object(compression, 'brotli', None):
+            self.assertEqual(choose_encoding('br, gzip'), 'gzip')
+
+    def test_gzip_response(self):
+        response = self.process(HttpResponse(BODY))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_streaming_response(self):
+        """Потоковый ответ сжимается по кусочкам."""
+        response = self.process(
+            StreamingHttpResponse(iter([BODY, BODY]))
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        content = b''.join(response.streaming_content)
+        self.assertEqual(gzip.decompress(content), BODY + BODY)
+
+    def test_skipped_responses(self):
+        """Короткие и уже сжатые ответы отдаются как есть."""
+        responses = (
+            HttpResponse(b'short'),
+            HttpResponse(BODY, content_type='image/png'),
+        )
+        for response in responses:
+            with self.subTest(response=response):
+                processed = self.process(response)
+                self.assertFalse(processed.has_header('Content-Encoding'))
+
+    def test_cacheable_response_compressed_once(self):
+        """Кэшируемая страница сжимается один раз."""
+        with mock.patch.object(
+            compression, 'compress', wraps=compression.compress
+        ) as compress:
+            for _ in range(3):
+                response = HttpResponse(BODY)
+                response['Cache-Control'] = 'max-age=600'
+                self.process(response)
+        self.assertEqual(compress.call_count, 1)
+
+    def test_marked_response_compressed_once(self):
+        """Тело, помеченное как взятое из кэша, сжимается один раз."""
+        with mock.patch.object(
+            compression, 'compress', wraps=compression.compress
+        ) as compress:
+            for _ in range(3):
+                self.process(mark_cached(HttpResponse(BODY)))
+        self.assertEqual(compress.call_count, 1)
+
+    def test_cached_feed_compressed_once(self):
+        """Лента из кэша не сжимается заново на каждом запросе."""
+        client = Client(HTTP_ACCEPT_ENCODING='gzip')
+        with mock.patch.object(
+            compression, 'compress', wraps=compression.compress
+        ) as compress:
+            for _ in range(3):
+                response = client.get(reverse('posts:feed_rss'))
+                self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(compress.call_count, 1)
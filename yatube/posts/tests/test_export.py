@@ -0,0 +1,60 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание группы',
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Пост, #{i}', author=cls.admin, group=cls.group)
+            for i in range(5)
+        )
+
+    def test_admin_streaming_export(self):
+        """Действие админки отдаёт выбранные колонки потоком."""
+        client = Client()
+        client.force_login(self.admin)
+        response = client.post(
+            reverse('admin:posts_post_changelist'),
+            {
+                'action': 'export_stream',
+                '_selected_action': Post.objects.values_list('pk', flat=True),
+                'columns': 'id,author',
+                'export_format': 'csv',
+            },
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,author')
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(lines[1].endswith(',admin'))
+
+    def test_command_jsonl(self):
+        out = StringIO()
+        call_command(
+            'export_posts', '--format', 'jsonl', '--columns', 'text,group',
+            '--chunk-size', '2', stdout=out,
+        )
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0], {'text': 'Пост, #0', 'group': 'test-slug'})
@@ -0,0 +1,158 @@
+import os
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import (
+    Client,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from ..feeds import (
+    FEED_VERSION_KEY,
+    get_feed_version,
+    invalidate_feeds,
+    prime_feeds,
+)
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание группы',
+        )
+        cls.post = Post.objects.create(
+            text='Пост в группе',
+            author=cls.user,
+            group=cls.group,
+        )
+        cls.other_post = Post.objects.create(
+            text='Пост без группы',
+            author=cls.user,
+        )
+
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    def test_feeds_available(self):
+        """Ленты отдаются с валидаторами."""
+        urls = (
+            reverse('posts:feed_rss'),
+            reverse('posts:feed_atom'),
+            reverse('posts:group_feed_rss', kwargs={'slug': 'test-slug'}),
+            reverse('posts:group_feed_atom', kwargs={'slug': 'test-slug'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertTrue(response.has_header('ETag'))
+                self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_group_feed_filters_posts(self):
+        """Лента группы содержит только посты группы."""
+        response = self.client.get(
+            reverse('posts:group_feed_rss', kwargs={'slug': 'test-slug'})
+        )
+        self.assertContains(response, 'Пост в группе')
+        self.assertNotContains(response, 'Пост без группы')
+
+    def test_unknown_group_feed(self):
+        response = self.client.get(
+            reverse('posts:group_feed_rss', kwargs={'slug': 'unknown'})
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_conditional_request(self):
+        """Повторный запрос с ETag получает 304."""
+        url = reverse('posts:feed_rss')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_prime_feeds(self):
+        """Прогретая лента отдаётся без запросов к базе."""
+        prime_feeds('testserver')
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('posts:feed_atom'))
+        self.assertContains(response, 'Пост в группе')
+
+
+class FeedInvalidationTests(TransactionTestCase):
+    """Ленты сбрасываются после коммита, поэтому без TestCase."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='auth')
+
+    def test_feed_rebuilt_on_create_and_delete(self):
+        """Лента пересобирается при создании и удалении поста."""
+        url = reverse('posts:feed_rss')
+        self.client.get(url)
+        new_post = Post.objects.create(text='Свежий пост', author=self.user)
+        self.assertContains(self.client.get(url), 'Свежий пост')
+        new_post.delete()
+        self.assertNotContains(self.client.get(url), 'Свежий пост')
+
+    def test_feed_rebuilt_on_edit(self):
+        """Правка поста сразу видна в ленте."""
+        post = Post.objects.create(text='Черновик', author=self.user)
+        url = reverse('posts:feed_rss')
+        self.client.get(url)
+        post.text = 'Исправленный пост'
+        post.save()
+        self.assertContains(self.client.get(url), 'Исправленный пост')
+
+    def test_group_feed_rebuilt_on_edit_and_delete(self):
+        """Правка группы видна в её ленте, удалённая группа отдаёт 404."""
+        Group.objects.create(title='Коты', slug='cats', description='-')
+        url = reverse('posts:group_feed_rss', kwargs={'slug': 'cats'})
+        self.assertContains(self.client.get(url), 'Yatube: Коты')
+        group = Group.objects.get(slug='cats')
+        group.title = 'Кошки'
+        group.save()
+        response = self.client.get(url)
+        self.assertContains(response, 'Yatube: Кошки')
+        self.assertNotContains(response, 'Yatube: Коты')
+        group.delete()
+        self.assertEqual(
+            self.client.get(url).status_code, HTTPStatus.NOT_FOUND
+        )
+
+
+SHARED_LOCATION = os.path.join(settings.TEST_TMP_ROOT, 'shared-cache')
+
+
+@override_settings(CACHES={
+    **settings.CACHES,
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': SHARED_LOCATION,
+    },
+})
+class SharedFeedVersionTests(TestCase):
+    def test_invalidation_seen_by_other_workers(self):
+        """Сброс лент в одном воркере виден по общему кэшу в другом."""
+        other_worker = FileBasedCache(SHARED_LOCATION, {})
+        version = get_feed_version()
+        self.assertEqual(other_worker.get(FEED_VERSION_KEY), version)
+        invalidate_feeds()
+        self.assertNotEqual(other_worker.get(FEED_VERSION_KEY), version)
+        self.assertEqual(
+            other_worker.get(FEED_VERSION_KEY), get_feed_version()
+        )
@@ -0,0 +1,57 @@
+import os
+import time
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..storage import content_storage
+from .factories import clear_media, create_post, small_gif
+
+
+class GarbageCollectMediaTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.post = create_post(image=small_gif())
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        clear_media()
+
+    def setUp(self):
+        self.orphan = content_storage.save(
+            'posts/orphan.gif', ContentFile(b'orphan')
+        )
+        self.fresh = content_storage.save(
+            'posts/fresh.gif', ContentFile(b'fresh')
+        )
+        old = time.time() - 2 * 60 * 60
+        for name in (self.orphan, self.post.image.name):
+            os.utime(content_storage.path(name), (old, old))
+
+    def gc(self, *args):
+        out = StringIO()
+        call_command('gc_media', *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_keeps_files(self):
+        output = self.gc('--dry-run')
+        self.assertIn(self.orphan, output)
+        self.assertTrue(content_storage.exists(self.orphan))
+
+    def test_orphans_removed(self):
+        """Удаляются только старые файлы без ссылок из постов."""
+        self.gc()
+        self.assertFalse(content_storage.exists(self.orphan))
+        self.assertTrue(content_storage.exists(self.fresh))
+        self.assertTrue(content_storage.exists(self.post.image.name))
+
+    def test_reuploaded_orphan_kept(self):
+        """Повторная загрузка старого файла-сироты защищает его от сборки."""
+        name = content_storage.save('posts/again.gif', ContentFile(b'orphan'))
+        self.assertEqual(name, self.orphan)
+        self.gc()
+        self.assertTrue(content_storage.exists(self.orphan))
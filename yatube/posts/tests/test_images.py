@@ -0,0 +1,62 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post
+from .factories import clear_media, create_post, small_gif
+
+
+class ImageMetadataTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.post = create_post(image=small_gif())
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        clear_media()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_metadata_filled_on_upload(self):
+        post = Post.objects.get(pk=self.post.pk)
+        expected = {
+            'image_width': 2,
+            'image_height': 1,
+            'image_size': 43,
+            'image_format': 'GIF',
+        }
+        for field, value in expected.items():
+            with self.subTest(field=field):
+                self.assertEqual(getattr(post, field), value)
+        self.assertRegex(post.image_color, r'^#[0-9a-f]{6}$')
+
+    def test_card_renders_dimensions(self):
+        """Карточка выводит размеры миниатюры, lazy-загрузку и заглушку."""
+        response = Client().get(reverse('posts:index'))
+        # Миниатюра 700x500 из картинки 2x1 сохраняет пропорции.
+        self.assertContains(response, 'width="700" height="350"')
+        self.assertContains(response, 'height: auto;')
+        self.assertContains(response, 'loading="lazy"')
+        self.assertContains(response, 'background-color: #')
+
+    def test_backfill(self):
+        """Команда заполняет метаданные у старых постов."""
+        Post.objects.filter(pk=self.post.pk).update(
+            image_width=None,
+            image_height=None,
+            image_size=None,
+            image_format='',
+            image_color='',
+        )
+        call_command(
+            'backfill_image_metadata', '--workers', '2', stdout=StringIO()
+        )
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual((post.image_width, post.image_height), (2, 1))
+        self.assertEqual(post.image_format, 'GIF')
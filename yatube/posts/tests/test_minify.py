@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from yatube.minify import minify_html
+
+User = get_user_model()
+
+
+class MinifyHtmlTests(SimpleTestCase):
+    def test_whitespace_collapsed_line_numbers_kept(self):
+        source = '<ul>\n    <li>  один  </li>\n\n    <li>два</li>\n</ul>'
+        minified = minify_html(source)
+        self.assertEqual(
+            minified, '<ul>\n<li> один </li>\n\n<li>два</li>\n</ul>'
+        )
+        self.assertEqual(minified.count('\n'), source.count('\n'))
+
+    def test_comments_removed(self):
+        source = (
+            '{# подсказка #}<p>{% comment "x" %}скрыто{% endcomment %}'
+            'текст<!-- заметка --></p><!--[if IE]>ie<![endif]-->'
+        )
+        self.assertEqual(
+            minify_html(source), '<p>текст</p><!--[if IE]>ie<![endif]-->'
+        )
+
+    def test_protected_blocks_untouched(self):
+        for block in (
+            '<pre>  a\n    b</pre>',
+            '<textarea>  x  </textarea>',
+            '<script>\n  var a  = 1;\n</script>',
+            '{% blocktrans %}Всего  {{ n }}{% endblocktrans %}',
+            '{{ value|default:"a  b" }}',
+        ):
+            with self.subTest(block=block):
+                self.assertEqual(minify_html(f'<div>  {block}  </div>'),
+                                 f'<div> {block} </div>')
+
+    def test_rendering_unchanged(self):
+        source = (
+            '{% for item in items %}\n  <b>{{ item }}</b>\n'
+            '{% endfor %}<pre>  {{ items|length }}</pre>'
+        )
+        context = Context({'items': ['a', 'b']})
+        self.assertEqual(
+            Template(minify_html(source)).render(context),
+            '\n<b>a</b>\n\n<b>b</b>\n<pre>  2</pre>',
+        )
+
+
+class MinifiedPagesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_superuser('admin', 'a@a.a', 'pass')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_no_indentation_in_pages(self):
+        client = Client()
+        client.force_login(self.user)
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:post_create'),
+            reverse('admin:posts_post_changelist'),
+        ):
+            with self.subTest(url=url):
+                content = client.get(url).content.decode()
+                # Виджеты форм рисуются своим движком и не сжимаются.
+                self.assertNotIn('\n    ', content.split('<script')[0])
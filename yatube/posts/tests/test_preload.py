@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.template.backends.django import Template
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from yatube import preload
+
+CRITICAL = (
+    'css/bootstrap.min.css',
+    'img/logo.png',
+    'img/fav/favicon.ico',
+    'img/fav/apple-touch-icon.png',
+    'img/fav/favicon-32x32.png',
+    'img/fav/favicon-16x16.png',
+)
+
+
+@override_settings(INDEX_CACHE_TIMEOUT=0)
+class PreloadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        preload.template_links.cache_clear()
+        self.hints = []
+        self.client = Client(**{preload.EARLY_HINTS_KEY: self.hints.append})
+
+    def test_feed_preloads_critical_static(self):
+        """Лента отдаёт Link: rel=preload на стили, логотип и фавиконки."""
+        link = self.client.get(reverse('posts:index'))['Link']
+        for path in CRITICAL:
+            with self.subTest(path=path):
+                self.assertIn(f'</django_static/{path}>; rel=preload', link)
+        self.assertIn('bootstrap.min.css>; rel=preload; as=style', link)
+        self.assertIn('logo.png>; rel=preload; as=image', link)
+
+    def test_template_render_not_patched(self):
+        """Шаблоны берутся из TemplateResponse, движок не подменяется."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(response.template_name, 'posts/index.html')
+        self.assertEqual(Template.render.__module__, Template.__module__)
+
+    def test_links_computed_once_per_template(self):
+        """Файлы шаблона собираются только при первом его выводе."""
+        self.client.get(reverse('posts:index'))
+        misses = preload.template_links.cache_info().misses
+        self.client.get(reverse('posts:index'))
+        self.assertEqual(preload.template_links.cache_info().misses, misses)
+
+    def test_early_hints_sent_before_view(self):
+        """Со второго запроса к представлению уходят 103 Early Hints."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(self.hints, [])
+        self.client.get(reverse('posts:index'))
+        self.assertEqual(self.hints, [[('Link', response['Link'])]])
+
+    def test_no_early_hints_when_disabled(self):
+        """Без PRELOAD_EARLY_HINTS подсказки не отправляются."""
+        with self.settings(PRELOAD_EARLY_HINTS=False):
+            self.client.get(reverse('posts:index'))
+            self.client.get(reverse('posts:index'))
+        self.assertEqual(self.hints, [])
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.db import connection
+
+
+def test_fast_profile(post_factory, group_factory):
+    """Тесты идут на sqlite в памяти, с MD5 и медиа во временной папке."""
+    post = post_factory(group=group_factory())
+    post.author.set_password('pass')
+    assert post.author.password.startswith('md5$')
+    assert connection.creation.is_in_memory_db(
+        connection.settings_dict['NAME']
+    )
+    assert settings.MEDIA_ROOT.startswith(settings.TEST_TMP_ROOT)
+    assert post.group.posts.get() == post
@@ -0,0 +1,99 @@
+import json
+import os
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template.base import Template
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from yatube.profiler import make_token
+
+from ..models import Post
+
+User = get_user_model()
+
+
+@override_settings(PROFILE_SAMPLE_INTERVAL=0.001)
+class ProfilerTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.user = User.objects.create_user(username='user')
+        Post.objects.create(text='Пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def load(self, response, suffix):
+        path = os.path.join(
+            settings.PROFILE_ROOT, response['X-Profile-Id'] + suffix
+        )
+        with open(path, encoding='utf-8') as file_:
+            if suffix == '.json':
+                return json.load(file_)
+            return file_.read()
+
+    def test_template_timing_removed_after_request(self):
+        """Замер шаблонов снимается, когда профилируемый запрос закончен."""
+        render = Template._render
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('posts:index') + '?profile')
+        self.assertIn('X-Profile-Id', response)
+        self.assertIs(Template._render, render)
+
+    def test_not_triggered_without_flag(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn('X-Profile-Id', response)
+
+    def test_query_flag_only_for_staff(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('posts:index') + '?profile')
+        self.assertNotIn('X-Profile-Id', response)
+        # Иначе карточки придут из кэша фрагмента первой страницы.
+        cache.clear()
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('posts:index') + '?profile')
+        self.assertIn('X-Profile-Id', response)
+        report = self.load(response, '.json')
+        self.assertEqual(report['mode'], 'sample')
+        self.assertTrue(report['queries'])
+        self.assertIn(
+            'posts/index.html', [t['template'] for t in report['templates']]
+        )
+        self.assertIn(
+            'includes/card.html', [t['template'] for t in report['templates']]
+        )
+
+    def test_signed_header_with_cprofile(self):
+        response = self.client.get(
+            reverse('posts:index') + '?profile=cprofile',
+            HTTP_X_PROFILE=make_token(),
+        )
+        collapsed = self.load(response, '.collapsed')
+        stack, count = collapsed.splitlines()[0].rsplit(' ', 1)
+        self.assertIn(';', stack)
+        self.assertTrue(int(count) >= 0)
+        self.assertTrue(os.path.exists(os.path.join(
+            settings.PROFILE_ROOT, response['X-Profile-Id'] + '.prof'
+        )))
+
+    def test_bad_token_ignored(self):
+        response = self.client.get(
+            reverse('posts:index'), HTTP_X_PROFILE='поддельный'
+        )
+        self.assertNotIn('X-Profile-Id', response)
+
+    def test_token_command(self):
+        out = StringIO()
+        call_command('profile_token', stdout=out, stderr=StringIO())
+        response = self.client.get(
+            reverse('posts:home'), HTTP_X_PROFILE=out.getvalue().strip()
+        )
+        self.assertIn('X-Profile-Id', response)
@@ -0,0 +1,93 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from .. import queryplans
+from ..feeds import get_feed_version
+from ..models import Post
+from ..queryplans import check_pages, find_problems, format_problem
+
+User = get_user_model()
+
+
+def test_key_pages_use_indexes(query_plans):
+    """Главная, создание поста и админка не читают posts_post целиком."""
+    problems = query_plans()
+    assert not problems, '\n'.join(map(format_problem, problems))
+
+
+class FindProblemsTests(SimpleTestCase):
+    tables = ('posts_post',)
+
+    def test_sqlite_plans(self):
+        sql = 'SELECT * FROM "posts_post" ORDER BY "text"'
+        cases = {
+            'SCAN posts_post': ['последовательное чтение posts_post'],
+            'SCAN posts_post USING INDEX posts_post_pub_date': [],
+            'USE TEMP B-TREE FOR ORDER BY': [
+                'сортировка во временной области'
+            ],
+            'SCAN posts_group': [],
+        }
+        for line, expected in cases.items():
+            with self.subTest(line=line):
+                self.assertEqual(
+                    find_problems('sqlite', sql, [line], self.tables),
+                    expected,
+                )
+
+    def test_small_table_sort_is_fine(self):
+        sql = 'SELECT * FROM "posts_group" ORDER BY "title"'
+        plan = ['SCAN posts_group', 'USE TEMP B-TREE FOR ORDER BY']
+        self.assertEqual(find_problems('sqlite', sql, plan, self.tables), [])
+
+    def test_postgres_plans(self):
+        sql = 'SELECT * FROM "posts_post" ORDER BY "text"'
+        plan = {
+            'Node Type': 'Limit',
+            'Plans': [{
+                'Node Type': 'Sort',
+                'Plans': [{
+                    'Node Type': 'Seq Scan',
+                    'Relation Name': 'posts_post',
+                }],
+            }],
+        }
+        self.assertEqual(
+            find_problems('postgresql', sql, plan, self.tables),
+            [
+                'сортировка во временной области',
+                'последовательное чтение posts_post',
+            ],
+        )
+
+
+class CheckQueryPlansCommandTests(TestCase):
+    def test_command_rolls_back_seed(self):
+        """Посты откатываются, кэш лент и главной из них сбрасывается."""
+        version = get_feed_version()
+        out = StringIO()
+        call_command('check_query_plans', '--seed', '500', stdout=out)
+        self.assertIn('в порядке', out.getvalue())
+        self.assertFalse(Post.objects.exists())
+        self.assertNotEqual(get_feed_version(), version)
+
+
+class CheckPagesTests(TestCase):
+    def test_warm_index_still_explained(self):
+        """Запрос ленты попадает в EXPLAIN и при тёплом кэше главной."""
+        cache.clear()
+        user = User.objects.create_superuser('admin', 'a@example.com', None)
+        Post.objects.create(text='Пост', author=user)
+        Client().get(reverse('posts:index'))
+        with mock.patch.object(
+            queryplans, 'explain', wraps=queryplans.explain
+        ) as explain:
+            check_pages(user, pages=('posts:index',))
+        explained = [call.args[1] for call in explain.call_args_list]
+        self.assertTrue(any('"posts_post"."text"' in sql for sql in explained))
@@ -0,0 +1,119 @@
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http.multipartparser import MultiPartParser
+from django.test import (
+    Client,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from yatube import ratelimit
+
+from ..models import Post
+
+User = get_user_model()
+
+
+class TakeTests(SimpleTestCase):
+    def setUp(self):
+        ratelimit.reset()
+        self.addCleanup(ratelimit.reset)
+
+    def test_bucket_refills_over_time(self):
+        limits = {'key': (2, 60)}
+        self.assertEqual(ratelimit.take(limits, now=1000), 0)
+        self.assertEqual(ratelimit.take(limits, now=1000), 0)
+        self.assertEqual(ratelimit.take(limits, now=1000), 30)
+        self.assertEqual(ratelimit.take(limits, now=1030), 0)
+
+    def test_denied_request_takes_nothing(self):
+        """При отказе по одному ведру второе не тратится."""
+        ratelimit.take({'full': (1, 60)}, now=1000)
+        wait = ratelimit.take({'full': (1, 60), 'other': (1, 60)}, now=1000)
+        self.assertEqual(wait, 60)
+        self.assertEqual(ratelimit.take({'other': (1, 60)}, now=1000), 0)
+
+
+@override_settings(RATE_LIMIT_TRUSTED_PROXIES=['127.0.0.1', '10.1.0.0/16'])
+class ClientIpTests(SimpleTestCase):
+    def client_ip(self, remote_addr, forwarded=None):
+        extra = {'REMOTE_ADDR': remote_addr}
+        if forwarded is not None:
+            extra['HTTP_X_FORWARDED_FOR'] = forwarded
+        return ratelimit.get_client_ip(RequestFactory().get('/', **extra))
+
+    def test_forwarded_for_trusted_only_from_proxy(self):
+        """X-Forwarded-For учитывается только от доверенного прокси."""
+        cases = (
+            (('203.0.113.5',), '203.0.113.5'),
+            (('203.0.113.5', '198.51.100.1'), '203.0.113.5'),
+            (('127.0.0.1',), '127.0.0.1'),
+            (('127.0.0.1', '198.51.100.1'), '198.51.100.1'),
+            (('127.0.0.1', '6.6.6.6, 198.51.100.1, 10.1.2.3'),
+             '198.51.100.1'),
+            (('127.0.0.1', 'мусор'), 'мусор'),
+        )
+        for args, expected in cases:
+            with self.subTest(args=args):
+                self.assertEqual(self.client_ip(*args), expected)
+
+
+@override_settings(RATE_LIMIT_PER_USER=(2, 60), RATE_LIMIT_PER_IP=(3, 60))
+class PostCreateRateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+
+    def setUp(self):
+        ratelimit.reset()
+        self.addCleanup(ratelimit.reset)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def post(self, client, remote_addr='10.0.0.1'):
+        image = SimpleUploadedFile('small.gif', b'GIF89a', 'image/gif')
+        return client.post(
+            reverse('posts:post_create'),
+            {'text': 'Пост', 'image': image},
+            REMOTE_ADDR=remote_addr,
+        )
+
+    def test_user_limit(self):
+        for _ in range(2):
+            self.post(self.client)
+        with mock.patch.object(
+            MultiPartParser, 'parse', autospec=True
+        ) as parse:
+            response = self.post(self.client)
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+        parse.assert_not_called()
+
+    def test_ip_limit_shared_by_users(self):
+        other_client = Client()
+        other_client.force_login(self.other)
+        for client in (self.client, self.client, other_client):
+            self.assertNotEqual(
+                self.post(client).status_code,
+                HTTPStatus.TOO_MANY_REQUESTS,
+            )
+        response = self.post(other_client)
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        response = self.post(other_client, remote_addr='10.0.0.2')
+        self.assertNotEqual(
+            response.status_code, HTTPStatus.TOO_MANY_REQUESTS
+        )
+
+    def test_form_page_not_limited(self):
+        for _ in range(5):
+            response = self.client.get(reverse('posts:post_create'))
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertFalse(Post.objects.exists())
@@ -0,0 +1,65 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import ArchivedPost, Post
+from ..rendering import RENDERER_VERSION
+
+User = get_user_model()
+
+
+class PostRenderingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            text='Первая строка\n<b>вторая</b>',
+            author=cls.user,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_html_rendered_on_save(self):
+        self.assertEqual(
+            self.post.text_html,
+            'Первая строка<br>&lt;b&gt;вторая&lt;/b&gt;',
+        )
+        self.assertEqual(self.post.text_html_version, RENDERER_VERSION)
+
+    def test_index_outputs_stored_html(self):
+        response = Client().get(reverse('posts:index'))
+        self.assertContains(
+            response, 'Первая строка<br>&lt;b&gt;вторая&lt;/b&gt;'
+        )
+
+    def test_render_command_updates_stale_posts(self):
+        """Команда пересобирает посты с устаревшей версией."""
+        Post.objects.filter(pk=self.post.pk).update(
+            text_html='', text_html_version=0
+        )
+        call_command('render_posts', stdout=StringIO())
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.text_html_version, RENDERER_VERSION)
+        self.assertIn('<br>', post.text_html)
+
+    def test_render_command_updates_archive(self):
+        """Команда пересобирает и архивные посты."""
+        archived = ArchivedPost.objects.create(
+            pk=self.post.pk + 1,
+            text='Архив\nстрока',
+            author=self.user,
+            pub_date=self.post.pub_date,
+        )
+        ArchivedPost.objects.filter(pk=archived.pk).update(
+            text_html='', text_html_version=0
+        )
+        call_command('render_posts', stdout=StringIO())
+        archived.refresh_from_db()
+        self.assertEqual(archived.text_html_version, RENDERER_VERSION)
+        self.assertEqual(archived.text_html, 'Архив<br>строка')
@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from yatube import routers
+from yatube.routers import use_replica
+
+from ..models import Post
+
+User = get_user_model()
+
+
+@override_settings(REPLICA_DATABASES=['replica'], INDEX_CACHE_TIMEOUT=0)
+class ReplicaRoutingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.replica_reads = []
+
+        # Запоминаем решение роутера, но читаем с default: в тестах
+        # реплика — зеркало основной базы.
+        def db_for_read(router, model, **hints):
+            if model is Post:
+                self.replica_reads.append(routers._use_replica.get())
+            return None
+
+        patcher = mock.patch.object(
+            routers.ReplicaRouter, 'db_for_read', db_for_read
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_router(self):
+        router = routers.ReplicaRouter()
+        mock.patch.stopall()
+        self.assertIsNone(router.db_for_read(Post))
+        with use_replica():
+            self.assertEqual(router.db_for_read(Post), 'replica')
+        self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'posts'))
+
+    def test_feed_reads_from_replica(self):
+        self.client.get(reverse('posts:index'))
+        self.assertTrue(self.replica_reads)
+        self.assertTrue(all(self.replica_reads))
+
+    def test_other_views_read_from_primary(self):
+        self.client.get(reverse('posts:post_create'))
+        self.assertFalse(any(self.replica_reads))
+
+    def test_read_your_writes(self):
+        """После своей записи пользователь читает с основной базы."""
+        response = self.client.post(
+            reverse('posts:post_create'), {'text': 'Новый пост'}
+        )
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+        self.replica_reads.clear()
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Новый пост')
+        self.assertTrue(self.replica_reads)
+        self.assertFalse(any(self.replica_reads))
@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY, get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from yatube.auth import clear_user_cache
+from yatube.sessions import SessionStore
+
+User = get_user_model()
+
+
+class SessionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', password='pass-word-1'
+        )
+
+    def setUp(self):
+        clear_user_cache()
+        self.client = Client()
+        self.client.login(username='auth', password='pass-word-1')
+
+    def test_authenticated_request_skips_session_and_user_tables(self):
+        """Повторный запрос не читает django_session и auth_user."""
+        self.client.get(reverse('posts:post_create'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('posts:post_create'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        tables = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('django_session', tables)
+        self.assertNotIn('auth_user', tables)
+
+    def test_password_change_logs_out(self):
+        """Смена пароля разлогинивает, несмотря на кэш пользователя."""
+        self.client.get(reverse('posts:post_create'))
+        self.user.set_password('other-pass-2')
+        self.user.save()
+        response = self.client.get(reverse('posts:post_create'))
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_login_written_through_to_database(self):
+        """Вход сразу пишется в базу и переживает потерю кэша сессий."""
+        client = Client()
+        response = client.post(reverse('login'), {
+            'username': 'auth', 'password': 'pass-word-1',
+        })
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        session_key = client.cookies[settings.SESSION_COOKIE_NAME].value
+        session = Session.objects.get(session_key=session_key)
+        self.assertEqual(
+            session.get_decoded().get(SESSION_KEY), str(self.user.pk)
+        )
+        caches[settings.SESSION_CACHE_ALIAS].clear()
+        clear_user_cache()
+        response = client.get(reverse('posts:post_create'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_clear_expired_in_batches(self):
+        """Истёкшие сессии удаляются пачками, живые остаются."""
+        expired = timezone.now() - timezone.timedelta(days=1)
+        Session.objects.bulk_create(
+            Session(
+                session_key=f'expired{i}',
+                session_data='',
+                expire_date=expired,
+            )
+            for i in range(25)
+        )
+        alive = Session.objects.filter(expire_date__gte=timezone.now())
+        alive_count = alive.count()
+        SessionStore.clear_expired(batch_size=10)
+        self.assertFalse(
+            Session.objects.filter(expire_date__lt=timezone.now()).exists()
+        )
+        self.assertEqual(alive.count(), alive_count)
@@ -0,0 +1,120 @@
+import os
+import shutil
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from ..models import ArchivedPost, Group, Post
+from ..sitemaps import (
+    GROUPS_NAME,
+    INDEX_NAME,
+    build_sitemap,
+    shard_name,
+    update_newest_shard,
+)
+
+User = get_user_model()
+
+
+def read(name):
+    path = os.path.join(settings.SITEMAP_ROOT, name)
+    with open(path, encoding='utf-8') as file_:
+        return file_.read()
+
+
+@override_settings(SITEMAP_SHARD_SIZE=2, SITEMAP_BASE_URL='https://yatube.ru')
+class SitemapTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Group.objects.create(title='Группа', slug='cats', description='-')
+        cls.posts = [
+            Post.objects.create(text=f'Пост {i}', author=cls.user)
+            for i in range(3)
+        ]
+        archived = cls.posts[0]
+        ArchivedPost.objects.create(
+            id=archived.id,
+            text=archived.text,
+            author=cls.user,
+            pub_date=archived.pub_date,
+        )
+        Post.objects.filter(pk=archived.pk).delete()
+
+    def setUp(self):
+        shutil.rmtree(settings.SITEMAP_ROOT, ignore_errors=True)
+
+    def test_build_shards_and_index(self):
+        out = StringIO()
+        call_command('build_sitemap', stdout=out)
+        self.assertIn('постов 3, шардов 2', out.getvalue())
+        first, second = read(shard_name(1)), read(shard_name(2))
+        for post in self.posts[:2]:
+            self.assertIn(
+                f'<loc>https://yatube.ru/posts/{post.pk}/</loc>', first
+            )
+        self.assertIn(f'/posts/{self.posts[2].pk}/</loc>', second)
+        self.assertIn(
+            'https://yatube.ru/group/cats/feed/rss/', read(GROUPS_NAME)
+        )
+        index = read(INDEX_NAME)
+        for name in (GROUPS_NAME, shard_name(1), shard_name(2)):
+            self.assertIn(
+                f'<loc>https://yatube.ru/sitemaps/{name}</loc>', index
+            )
+
+    def test_new_posts_touch_only_newest_shard(self):
+        build_sitemap()
+        first_path = os.path.join(settings.SITEMAP_ROOT, shard_name(1))
+        os.utime(first_path, (0, 0))
+        new_posts = [
+            Post.objects.create(text=f'Новый {i}', author=self.user)
+            for i in range(2)
+        ]
+        update_newest_shard()
+        self.assertEqual(os.path.getmtime(first_path), 0)
+        second, third = read(shard_name(2)), read(shard_name(3))
+        self.assertIn(f'/posts/{self.posts[2].pk}/</loc>', second)
+        self.assertIn(f'/posts/{new_posts[0].pk}/</loc>', second)
+        self.assertEqual(second.count('<urlset'), 1)
+        self.assertTrue(second.endswith('</urlset>\n'))
+        self.assertIn(f'/posts/{new_posts[1].pk}/</loc>', third)
+        self.assertTrue(third.endswith('</urlset>\n'))
+        self.assertIn(shard_name(3), read(INDEX_NAME))
+
+    def test_torn_shard_not_appended(self):
+        """Оборванный шард не дописывается, пока его не пересоберут."""
+        build_sitemap()
+        path = os.path.join(settings.SITEMAP_ROOT, shard_name(2))
+        with open(path, 'r+b') as file_:
+            file_.truncate(os.path.getsize(path) - 3)
+        torn = read(shard_name(2))
+        Post.objects.create(text='Новый', author=self.user)
+        with self.assertRaises(ValueError):
+            update_newest_shard()
+        self.assertEqual(read(shard_name(2)), torn)
+
+    def test_update_without_build_does_nothing(self):
+        update_newest_shard()
+        self.assertFalse(os.path.exists(
+            os.path.join(settings.SITEMAP_ROOT, INDEX_NAME)
+        ))
+
+
+@override_settings(SITEMAP_BASE_URL='https://yatube.ru')
+class GroupSitemapTests(TransactionTestCase):
+    """Файл групп обновляется после коммита, поэтому без TestCase."""
+
+    def setUp(self):
+        shutil.rmtree(settings.SITEMAP_ROOT, ignore_errors=True)
+
+    def test_groups_follow_edits(self):
+        build_sitemap()
+        group = Group.objects.create(title='Группа', slug='cats')
+        self.assertIn('/group/cats/feed/rss/', read(GROUPS_NAME))
+        group.delete()
+        self.assertNotIn('/group/cats/feed/rss/', read(GROUPS_NAME))
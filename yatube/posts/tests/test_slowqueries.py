@@ -0,0 +1,102 @@
+import json
+import os
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from yatube.slowqueries import aggregate, normalize
+
+from ..models import Post
+
+User = get_user_model()
+
+
+class NormalizeTests(SimpleTestCase):
+    def test_values_replaced(self):
+        self.assertEqual(
+            normalize(
+                'SELECT * FROM "posts_post"\n  WHERE "id" IN (%s, %s, %s) '
+                "AND \"text\" = 'it''s' LIMIT 21"
+            ),
+            'SELECT * FROM "posts_post" WHERE "id" IN (...) '
+            'AND "text" = ? LIMIT ?',
+        )
+
+    def test_aggregate_by_fingerprint(self):
+        lines = [
+            json.dumps({
+                'fingerprint': 'a', 'sql': 'SELECT ?', 'ms': ms,
+                'view': 'posts:index', 'template': 'includes/card.html:5',
+            })
+            for ms in (120, 300)
+        ]
+        [item] = aggregate(lines + ['не JSON'])
+        self.assertEqual(item['count'], 2)
+        self.assertEqual(item['total_ms'], 420)
+        self.assertEqual(item['max_ms'], 300)
+        self.assertEqual(item['views'], {'posts:index'})
+
+
+@override_settings(SLOW_QUERY_MS=0)
+class SlowQueryLogTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_superuser('admin', 'a@a.a', 'pass')
+        Post.objects.create(text='Пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def logged(self, url):
+        """Записи журнала, появившиеся при открытии url."""
+        path = settings.SLOW_QUERY_LOG
+        start = os.path.getsize(path) if os.path.exists(path) else 0
+        self.client.get(url)
+        with open(path, encoding='utf-8') as log:
+            log.seek(start)
+            return [json.loads(line) for line in log]
+
+    def test_card_query_attributed_to_template(self):
+        """Подгрузка автора в карточке записывается на includes/card.html."""
+        entries = self.logged(reverse('posts:index'))
+        author_queries = [
+            entry for entry in entries
+            if entry['sql'].startswith('SELECT "auth_user"')
+            and entry['template']
+        ]
+        self.assertTrue(author_queries)
+        entry = author_queries[0]
+        self.assertEqual(entry['view'], 'posts:index')
+        self.assertTrue(entry['template'].startswith('includes/card.html:'))
+        self.assertIn('"id" = ?', entry['sql'])
+
+    def test_admin_changelist_view(self):
+        entries = self.logged(reverse('admin:posts_post_changelist'))
+        views = {entry['view'] for entry in entries}
+        self.assertIn('admin:posts_post_changelist', views)
+
+    def test_log_reopened_after_external_rotation(self):
+        """После переименования журнала logrotate пишется новый файл."""
+        path = settings.SLOW_QUERY_LOG
+        self.logged(reverse('posts:index'))
+        os.replace(path, f'{path}.1')
+        self.addCleanup(os.remove, f'{path}.1')
+        self.assertTrue(self.logged(reverse('posts:index')))
+        out = StringIO()
+        call_command('slow_queries', '--top', '50', stdout=out)
+        self.assertIn('posts:index', out.getvalue())
+
+    def test_summary_command(self):
+        self.logged(reverse('posts:index'))
+        out = StringIO()
+        call_command('slow_queries', '--top', '50', stdout=out)
+        self.assertIn('views: posts:index', out.getvalue())
+        self.assertIn('includes/card.html:', out.getvalue())
@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import (
+    Client,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from yatube import stampede
+
+from ..models import Post
+
+User = get_user_model()
+
+
+class GetOrComputeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        stampede.reset()
+        self.addCleanup(stampede.reset)
+        self.calls = 0
+
+    def compute(self, value='значение', delay=0):
+        def compute():
+            self.calls += 1
+            time.sleep(delay)
+            return value
+        return compute
+
+    def test_concurrent_misses_compute_once(self):
+        """Одновременные промахи ждут один пересчёт."""
+        results = []
+        compute = self.compute(delay=0.2)
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    stampede.get_or_compute('key', compute, 60)
+                )
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['значение'] * 5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(stampede.stats()['coalesced'], 4)
+
+    def test_stale_value_served_while_recomputed(self):
+        cache.set('key', ('старое', time.time() - 1, 0), 60)
+        owner = stampede._lock('key')
+        value = stampede.get_or_compute('key', self.compute('новое'), 60)
+        self.assertEqual(value, 'старое')
+        self.assertEqual(self.calls, 0)
+        stampede._unlock('key', owner)
+        value = stampede.get_or_compute('key', self.compute('новое'), 60)
+        self.assertEqual(value, 'новое')
+        self.assertEqual(stampede.stats()['stale'], 1)
+
+    @override_settings(STAMPEDE_BETA=1000)
+    def test_early_refresh(self):
+        """Дорогое значение пересчитывается заранее, до истечения."""
+        cache.set('key', ('старое', time.time() + 5, 1), 60)
+        value = stampede.get_or_compute('key', self.compute('новое'), 60)
+        self.assertEqual(value, 'новое')
+        self.assertEqual(stampede.stats()['early'], 1)
+
+    def test_lock_shared_between_processes(self):
+        """Блокировку, взятую в другом процессе, воркер не перехватывает."""
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # Дочерний процесс: своё соединение после fork.
+            os.close(read)
+            os.write(write, b'1' if stampede._lock('key') else b'0')
+            os._exit(0)
+        os.close(write)
+        os.waitpid(pid, 0)
+        with os.fdopen(read, 'rb') as child:
+            self.assertEqual(child.read(), b'1')
+        self.assertIsNone(stampede._lock('key'))
+
+    @override_settings(STAMPEDE_LOCK_TIMEOUT=0)
+    def test_abandoned_lock_expires(self):
+        self.assertIsNotNone(stampede._lock('key'))
+        self.assertIsNotNone(stampede._lock('key'))
+
+    def test_fresh_value_not_recomputed(self):
+        cache.set('key', ('свежее', time.time() + 60, 0), 60)
+        value = stampede.get_or_compute('key', self.compute(), 60)
+        self.assertEqual(value, 'свежее')
+        self.assertEqual(self.calls, 0)
+
+
+class IndexCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.create(text='Первый пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_first_page_rendered_once(self):
+        client = Client()
+        client.get(reverse('posts:index'))
+        # Из запросов остаётся только счётчик пагинатора.
+        with self.assertNumQueries(1):
+            response = client.get(reverse('posts:index'))
+        self.assertContains(response, 'Первый пост')
+
+
+class IndexInvalidationTests(TransactionTestCase):
+    """Кэш фрагмента сбрасывается после коммита, поэтому без TestCase."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth')
+        Post.objects.create(text='Первый пост', author=self.user)
+
+    def test_new_post_shown_at_once(self):
+        client = Client()
+        client.force_login(self.user)
+        client.get(reverse('posts:index'))
+        response = client.post(
+            reverse('posts:post_create'), {'text': 'Второй пост'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        self.assertContains(client.get(reverse('posts:index')), 'Второй пост')
+
+    def test_edited_post_shown_at_once(self):
+        post = Post.objects.get()
+        client = Client()
+        client.get(reverse('posts:index'))
+        post.text = 'Исправленный пост'
+        post.save()
+        self.assertContains(
+            client.get(reverse('posts:index')), 'Исправленный пост'
+        )
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from ..management.commands.startup_profile import parse_importtime
+
+
+class StartupTests(SimpleTestCase):
+    def test_parse_importtime(self):
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |     posts.models\n'
+            'import time:      1500 |       1620 | yatube.wsgi\n'
+        )
+        self.assertEqual(
+            parse_importtime(output),
+            {'posts.models': (120, 120), 'yatube.wsgi': (1500, 1620)},
+        )
+
+    def test_optional_subsystems_are_lazy(self):
+        """Старт приложения не импортирует админку постов и ленты."""
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='yatube.settings')
+        result = subprocess.run(
+            [
+                sys.executable, '-c',
+                'import sys, yatube.wsgi; '
+                'print("posts.admin" in sys.modules, '
+                '"posts.feeds" in sys.modules)',
+            ],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(result.stdout.split(), ['False', 'False'])
+
+    def test_cold_start_budget(self):
+        """Холодный старт укладывается в STARTUP_BUDGET_MS."""
+        out = StringIO()
+        call_command(
+            'startup_profile', '--runs', '1', '--top', '3', '--check',
+            stdout=out,
+        )
+        self.assertIn('Холодный старт yatube.wsgi', out.getvalue())
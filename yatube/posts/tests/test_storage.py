@@ -0,0 +1,47 @@
+import os
+
+from django.test import TestCase
+
+from ..models import MediaFile
+from ..storage import content_storage
+from .factories import clear_media, create_post, create_user, small_gif
+
+
+class ContentAddressedStorageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = create_user()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        clear_media()
+
+    def create_post(self, filename):
+        return create_post(author=self.user, image=small_gif(filename))
+
+    def test_identical_uploads_deduplicated(self):
+        """Одинаковые картинки хранятся одним файлом в шарде."""
+        first = self.create_post('first.gif')
+        second = self.create_post('second.GIF')
+        self.assertEqual(first.image.name, second.image.name)
+        directory, filename = os.path.split(first.image.name)
+        self.assertRegex(directory, r'^posts/[0-9a-f]{2}/[0-9a-f]{2}$')
+        self.assertRegex(filename, r'^[0-9a-f]{64}\.gif$')
+        self.assertEqual(
+            os.listdir(content_storage.path(directory)), [filename]
+        )
+        self.assertEqual(
+            MediaFile.objects.get(name=first.image.name).refcount, 2
+        )
+
+    def test_file_removed_with_last_reference(self):
+        """Файл удаляется только вместе с последней ссылкой."""
+        name = self.create_post('first.gif').image.name
+        self.create_post('second.gif')
+        content_storage.delete(name)
+        self.assertTrue(content_storage.exists(name))
+        content_storage.delete(name)
+        self.assertFalse(content_storage.exists(name))
+        self.assertFalse(MediaFile.objects.filter(name=name).exists())
@@ -0,0 +1,123 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class StandInProxy:
+    """
+    Заменитель кэширующего прокси: хранит ключи ответов по адресу и
+    по запросу PURGE выбрасывает ответы с любым из присланных ключей.
+    """
+
+    def __init__(self):
+        self.cached = {}
+        self.purged = []
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_PURGE(self):
+                keys = set(self.headers['Surrogate-Key'].split())
+                proxy.purged.append(keys)
+                for url, tags in list(proxy.cached.items()):
+                    if tags & keys:
+                        del proxy.cached[url]
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/'
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self.thread.start()
+
+    def fetch(self, client, url):
+        response = client.get(url)
+        if 'Surrogate-Key' in response:
+            self.cached[url] = set(response['Surrogate-Key'].split())
+        return response
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SurrogateKeyTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.proxy = StandInProxy()
+        self.addCleanup(self.proxy.close)
+        settings_override = override_settings(
+            SURROGATE_PURGE_URL=self.proxy.url
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='auth')
+        self.group = Group.objects.create(
+            title='Коты', slug='cats', description='-'
+        )
+        self.post = Post.objects.create(
+            text='Пост', author=self.user, group=self.group
+        )
+        self.other = Post.objects.create(text='Другой', author=self.user)
+        self.proxy.purged.clear()
+        self.client = Client()
+
+    def test_responses_tagged(self):
+        response = self.proxy.fetch(self.client, reverse('posts:index'))
+        self.assertEqual(response['Surrogate-Key'], 'feed')
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=86400', response['Surrogate-Control'])
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,))
+        )
+        self.assertEqual(response['Surrogate-Key'], f'post-{self.post.pk}')
+        response = self.client.get(
+            reverse('posts:group_feed_rss', args=('cats',))
+        )
+        self.assertEqual(response['Surrogate-Key'], 'feed group-cats')
+
+    def test_post_save_purges_targeted_keys(self):
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:post_detail', args=(self.post.pk,)),
+            reverse('posts:post_detail', args=(self.other.pk,)),
+        ]
+        for url in urls:
+            self.proxy.fetch(self.client, url)
+        self.post.text = 'Исправленный пост'
+        self.post.save()
+        self.assertEqual(
+            self.proxy.purged, [{'feed', f'post-{self.post.pk}'}]
+        )
+        self.assertEqual(list(self.proxy.cached), [urls[2]])
+
+    def test_post_delete_and_group_edit(self):
+        feed_url = reverse('posts:group_feed_rss', args=('cats',))
+        self.proxy.fetch(self.client, feed_url)
+        self.group.title = 'Кошки'
+        self.group.save()
+        self.assertEqual(self.proxy.purged, [{'group-cats'}])
+        self.assertNotIn(feed_url, self.proxy.cached)
+        other_pk = self.other.pk
+        self.other.delete()
+        self.assertEqual(self.proxy.purged[-1], {'feed', f'post-{other_pk}'})
+
+    def test_personal_responses_not_cached(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('posts:post_create'), {'text': 'Новый'}
+        )
+        self.assertNotIn('Surrogate-Key', response)
+        self.assertNotIn('Surrogate-Control', response)
@@ -0,0 +1,61 @@
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.core.files.storage import FileSystemStorage
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from sorl.thumbnail import default
+
+from ..thumbnails import KVStore
+from .factories import clear_media, create_post, create_user, small_gif
+
+
+# Фрагмент главной не кэшируется, чтобы каждый запрос выводил карточки.
+@override_settings(INDEX_CACHE_TIMEOUT=0)
+class ThumbnailStoreTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = create_user()
+        for i in range(3):
+            create_post(
+                author=user, image=small_gif(f'small{i}.gif', bytes([i]))
+            )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        clear_media()
+
+    def setUp(self):
+        cache.clear()
+        default.kvstore.local.clear()
+
+    def test_page_thumbnails_loaded_in_one_round_trip(self):
+        """Страница с картинками: один get_many и без обращений к диску."""
+        client = Client()
+        client.get(reverse('posts:index'))
+        default.kvstore.local.clear()
+        spy = mock.Mock(wraps=caches['default'])
+        with mock.patch.object(
+            KVStore, 'cache', new_callable=mock.PropertyMock,
+            return_value=spy,
+        ), mock.patch.object(FileSystemStorage, 'exists') as exists:
+            response = client.get(reverse('posts:index'))
+        self.assertEqual(spy.get_many.call_count, 1)
+        self.assertEqual(spy.get.call_count, 0)
+        exists.assert_not_called()
+        self.assertContains(response, '<img class="card-img-top"', count=3)
+
+    def test_worker_lru_serves_repeated_renders(self):
+        """Повторный рендер берёт метаданные из памяти воркера."""
+        client = Client()
+        client.get(reverse('posts:index'))
+        spy = mock.Mock(wraps=caches['default'])
+        with mock.patch.object(
+            KVStore, 'cache', new_callable=mock.PropertyMock,
+            return_value=spy,
+        ):
+            client.get(reverse('posts:index'))
+        spy.get_many.assert_not_called()
+        spy.get.assert_not_called()
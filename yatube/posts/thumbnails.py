@@ -0,0 +1,109 @@
+"""
+Хранилище метаданных миниатюр sorl для горячего пути.
+
+Записи всей страницы загружаются одним get_many (и не больше чем одним
+запросом к базе на промахи) и держатся в LRU воркера, поэтому вывод
+карточек не ходит ни в кэш по ключу на карточку, ни в файловую систему.
+"""
+from sorl.thumbnail import base, default
+from sorl.thumbnail.conf import settings
+from sorl.thumbnail.images import ImageFile
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.kvstores.cached_db_kvstore import (
+    EMPTY_VALUE,
+    KVStore as CachedDBKVStore,
+)
+from sorl.thumbnail.models import KVStore as KVStoreModel
+
+from yatube.lru import LRUCache
+from yatube.stampede import single_flight
+
+
+class KVStore(CachedDBKVStore):
+    def __init__(self):
+        super().__init__()
+        self.local = LRUCache(
+            settings.THUMBNAIL_LRU_SIZE, settings.THUMBNAIL_LRU_TIMEOUT
+        )
+
+    def prefetch(self, image_files):
+        keys = [add_prefix(image_file.key) for image_file in image_files]
+        missing = [key for key in keys if self.local.get(key) is None]
+        if missing:
+            self._load(missing)
+
+    def _load(self, keys):
+        values = self.cache.get_many(keys)
+        absent = [key for key in keys if key not in values]
+        if absent:
+            found = dict(
+                KVStoreModel.objects.filter(key__in=absent)
+                .values_list('key', 'value')
+            )
+            loaded = {key: found.get(key, EMPTY_VALUE) for key in absent}
+            self.cache.set_many(loaded, settings.THUMBNAIL_CACHE_TIMEOUT)
+            values.update(loaded)
+        for key, value in values.items():
+            self.local.set(key, value)
+        return values
+
+    def _get_raw(self, key):
+        value = self.local.get(key)
+        if value is None:
+            value = self._load([key])[key]
+        if value == EMPTY_VALUE:
+            return None
+        return value
+
+    def _set_raw(self, key, value):
+        super()._set_raw(key, value)
+        self.local.set(key, value)
+
+    def _delete_raw(self, *keys):
+        super()._delete_raw(*keys)
+        for key in keys:
+            self.local.delete(key)
+
+    def clear(self, delete_thumbnails=False):
+        super().clear(delete_thumbnails)
+        self.local.clear()
+
+
+class ThumbnailBackend(base.ThumbnailBackend):
+    def get_thumbnail(self, file_, geometry_string, **options):
+        """Одну и ту же миниатюру одновременно создаёт только один запрос."""
+        if not file_:
+            return super().get_thumbnail(file_, geometry_string, **options)
+        thumbnail = self.get_thumbnail_file(
+            file_, geometry_string, **options
+        )
+        cached = default.kvstore.get(thumbnail)
+        if cached:
+            return cached
+        with single_flight(f'thumbnail:{thumbnail.name}'):
+            return super().get_thumbnail(file_, geometry_string, **options)
+
+    def get_thumbnail_file(self, file_, geometry_string, **options):
+        """Миниатюра, которую вернёт get_thumbnail(), без её создания."""
+        # Повторяет подготовку опций из get_thumbnail() sorl-thumbnail.
+        source = ImageFile(file_)
+        if settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(base.settings, attr)
+            if value != getattr(base.default_settings, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return ImageFile(name, default.storage)
+
+
+def prefetch_thumbnails(files, geometry_string, **options):
+    files = [file_ for file_ in files if file_]
+    if not files or not hasattr(default.kvstore, 'prefetch'):
+        return
+    default.kvstore.prefetch(
+        default.backend.get_thumbnail_file(file_, geometry_string, **options)
+        for file_ in files
+    )
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name = 'posts'
 
@@ -8,5 +8,18 @@ urlpatterns = [
 
     path('', views.index, name='index'),
     path('home/', views.home, name='home'),
+    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
+    path('feed/rss/', feeds.rss_feed, name='feed_rss'),
+    path('feed/atom/', feeds.atom_feed, name='feed_atom'),
+    path(
+        'group/<slug:slug>/feed/rss/',
+        feeds.rss_feed,
+        name='group_feed_rss'
+    ),
+    path(
+        'group/<slug:slug>/feed/atom/',
+        feeds.atom_feed,
+        name='group_feed_atom'
+    ),
 ]
@@ -1,12 +1,18 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
-from django.shortcuts import get_object_or_404, redirect, render
+from django.http import Http404
+from django.shortcuts import get_object_or_404, redirect
+from django.template.response import TemplateResponse
 from django.views.decorators.cache import cache_page
 from django.conf import settings
 
+from yatube.compression import mark_cached
+from yatube.surrogate import tag_response
+
+from .feeds import FEED_SURROGATE_KEY, get_feed_version
 from .forms import PostForm
-from .models import Post
+from .models import Post, get_post, post_surrogate_key
 
 User = get_user_model()
 
@@ -21,7 +27,7 @@ def home(request):
     context = {
         'name': 'Джон Доу',
     }
-    return render(request, 'posts/home.html', context)
+    return TemplateResponse(request, 'posts/home.html', context)
 
 
 def index(request):
@@ -29,8 +35,29 @@ def index(request):
     page_obj = get_paginator(request, post_list)
     context = {
         'page_obj': page_obj,
+        # Кэшируется только первая, самая горячая страница; версия лент
+        # меняется с каждым новым или удалённым постом.
+        'cache_timeout': (
+            settings.INDEX_CACHE_TIMEOUT if page_obj.number == 1 else 0
+        ),
+        'feed_version': get_feed_version(),
+    }
+    response = TemplateResponse(request, 'posts/index.html', context)
+    if context['cache_timeout']:
+        # Тело одинаково, пока жив фрагмент, и сжимается один раз.
+        mark_cached(response)
+    return tag_response(response, FEED_SURROGATE_KEY)
+
+
+def post_detail(request, post_id):
+    post = get_post(post_id)
+    if post is None:
+        raise Http404
+    context = {
+        'post': post,
     }
-    return render(request, 'posts/index.html', context)
+    response = TemplateResponse(request, 'posts/post_detail.html', context)
+    return tag_response(response, post_surrogate_key(post.pk))
 
 
 @login_required
@@ -45,4 +72,4 @@ def post_create(request):
         'form': form,
         'is_edit': False
     }
-    return render(request, 'posts/create_post.html', context)
+    return TemplateResponse(request, 'posts/create_post.html', context)
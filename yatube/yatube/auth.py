@@ -0,0 +1,76 @@
+"""
+Кэш пользователей в памяти воркера.
+
+Пользователь из сессии кэшируется на AUTH_USER_CACHE_TIMEOUT секунд,
+поэтому запрос авторизованного пользователя не читает auth_user.
+Хэш сессии сверяется на каждом запросе с закэшированным пользователем.
+После смены пароля воркер, сохранивший пользователя, разлогинивает другие
+сессии сразу, а остальные воркеры — как только истечёт их копия, то есть
+в течение AUTH_USER_CACHE_TIMEOUT (30 секунд).
+"""
+import copy
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.db.models.signals import post_delete, post_save
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from .lru import LRUCache
+
+_users = LRUCache(
+    settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TIMEOUT
+)
+
+
+def _cache_key(request):
+    try:
+        return (
+            request.session[auth.SESSION_KEY],
+            request.session[auth.BACKEND_SESSION_KEY],
+        )
+    except KeyError:
+        return None
+
+
+def forget_user(user_pk):
+    _users.delete_many(lambda key: str(key[0]) == str(user_pk))
+
+
+def clear_user_cache():
+    _users.clear()
+
+
+def get_user(request):
+    key = _cache_key(request)
+    if key is not None:
+        user = _users.get(key)
+        if user is not None:
+            user = copy.copy(user)
+        session_hash = request.session.get(auth.HASH_SESSION_KEY)
+        if user is not None and session_hash and constant_time_compare(
+            session_hash, user.get_session_auth_hash()
+        ):
+            return user
+    user = auth.get_user(request)
+    if key is not None and user.is_authenticated:
+        _users.set(key, copy.copy(user))
+    return user
+
+
+class CachedUserAuthenticationMiddleware(AuthenticationMiddleware):
+    def process_request(self, request):
+        assert hasattr(request, 'session'), (
+            'CachedUserAuthenticationMiddleware requires '
+            'SessionMiddleware to be installed.'
+        )
+        request.user = SimpleLazyObject(lambda: get_user(request))
+
+
+def _user_changed(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+post_save.connect(_user_changed, sender=settings.AUTH_USER_MODEL)
+post_delete.connect(_user_changed, sender=settings.AUTH_USER_MODEL)
@@ -0,0 +1,162 @@
+"""
+Сжатие ответов brotli или gzip.
+
+Потоковые ответы сжимаются по кусочкам. Если тело ответа взято из кэша
+(ленты, первая страница главной с закэшированным списком постов —
+представление помечает такой ответ mark_cached()) или ответ можно
+кэшировать по Cache-Control: max-age, сжатое тело кладётся в кэш по хэшу
+исходного. Так одно и то же тело сжимается один раз, а не на каждом
+запросе.
+"""
+import hashlib
+import re
+import zlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+re_max_age = re.compile(r'\bmax-age=(\d+)')
+
+
+def supported_encodings():
+    if brotli is not None:
+        return ('br', 'gzip')
+    return ('gzip',)
+
+
+def choose_encoding(accept_encoding):
+    """Выбирает кодировку по Accept-Encoding с учётом q-значений."""
+    accepted = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        match = re.search(r'q=([0-9.]+)', params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    candidates = [
+        coding for coding in supported_encodings()
+        if accepted.get(coding, accepted.get('*', 0)) > 0
+    ]
+    if not candidates:
+        return None
+    # Порядок supported_encodings задаёт предпочтение при равных q.
+    return max(candidates, key=lambda coding: accepted.get(
+        coding, accepted.get('*', 0)
+    ))
+
+
+def compress(encoding, data):
+    if encoding == 'br':
+        return brotli.compress(data, quality=settings.COMPRESSION_LEVEL)
+    compressor = zlib.compressobj(
+        settings.COMPRESSION_LEVEL, wbits=GZIP_WBITS
+    )
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(encoding, chunks):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_LEVEL)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(
+        settings.COMPRESSION_LEVEL, wbits=GZIP_WBITS
+    )
+    for chunk in chunks:
+        data = (
+            compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        )
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def mark_cached(response):
+    """Помечает ответ, тело которого повторяется: его сжатие кэшируется."""
+    response.compression_cacheable = True
+    return response
+
+
+def is_cacheable(response):
+    cache_control = response.get('Cache-Control', '')
+    if 'private' in cache_control or 'no-store' in cache_control:
+        return False
+    if getattr(response, 'compression_cacheable', False):
+        return True
+    match = re_max_age.search(cache_control)
+    return bool(match) and int(match.group(1)) > 0
+
+
+def get_compressed(encoding, content, store):
+    if not store:
+        return compress(encoding, content)
+    cache = caches[settings.COMPRESSION_CACHE_ALIAS]
+    key = f'compressed:{encoding}:{hashlib.sha1(content).hexdigest()}'
+    compressed = cache.get(key)
+    if compressed is None:
+        compressed = compress(encoding, content)
+        cache.set(key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+    return compressed
+
+
+def should_compress(response):
+    if response.has_header('Content-Encoding'):
+        return False
+    if not response.streaming and (
+        len(response.content) < settings.COMPRESSION_MIN_LENGTH
+    ):
+        return False
+    content_type = response.get('Content-Type', '').split(';')[0].strip()
+    return not any(
+        content_type.startswith(skipped)
+        for skipped in settings.COMPRESSION_SKIP_TYPES
+    )
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    def process_response(self, request, response):
+        if not should_compress(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                encoding, response.streaming_content
+            )
+            del response['Content-Length']
+        else:
+            compressed = get_compressed(
+                encoding, response.content, is_cacheable(response)
+            )
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
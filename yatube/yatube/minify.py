@@ -0,0 +1,77 @@
+"""
+Сжатие HTML-шаблонов при загрузке.
+
+Загрузчики шаблонов отдают движку исходник .html уже без лишних пробелов
+и комментариев ({# #}, {% comment %} и HTML-комментариев, кроме условных),
+поэтому сжатие происходит один раз, при компиляции шаблона, а не на
+каждом запросе. Содержимое <pre>, <textarea>, <script>, <style>,
+{% blocktrans %} и {% verbatim %}, а также сами теги и переменные шаблона
+не меняются. Серия пробельных символов заменяется одним пробелом или
+теми же переводами строк, что в ней были, так что номера строк в
+сообщениях об ошибках шаблонов остаются верными.
+"""
+import re
+
+from django.conf import settings
+from django.template.loaders import app_directories, filesystem
+
+PROTECTED = re.compile(
+    r'(<(pre|textarea|script|style)\b.*?</\2\s*>'
+    r'|{%\s*blocktrans\b.*?{%\s*endblocktrans\s*%}'
+    r'|{%\s*verbatim\b.*?{%\s*endverbatim\s*%})',
+    re.DOTALL | re.IGNORECASE,
+)
+COMMENTS = re.compile(
+    r'{%\s*comment\b.*?%}.*?{%\s*endcomment\s*%}'
+    r'|{#.*?#}'
+    r'|<!--(?!\[if).*?-->',
+    re.DOTALL,
+)
+TEMPLATE_SYNTAX = re.compile(r'({{.*?}}|{%.*?%})', re.DOTALL)
+WHITESPACE = re.compile(r'\s+')
+
+MINIFY_EXTENSIONS = ('.html', '.htm')
+
+
+def _keep_newlines(match):
+    return '\n' * match.group(0).count('\n')
+
+
+def _collapse(match):
+    return _keep_newlines(match) or ' '
+
+
+def _minify_part(source):
+    source = COMMENTS.sub(_keep_newlines, source)
+    parts = TEMPLATE_SYNTAX.split(source)
+    # Нечётные элементы — теги и переменные шаблона.
+    parts[::2] = [WHITESPACE.sub(_collapse, part) for part in parts[::2]]
+    return ''.join(parts)
+
+
+def minify_html(source):
+    """Исходник HTML-шаблона без лишних пробелов и комментариев."""
+    result = []
+    position = 0
+    for match in PROTECTED.finditer(source):
+        result.append(_minify_part(source[position:match.start()]))
+        result.append(match.group(0))
+        position = match.end()
+    result.append(_minify_part(source[position:]))
+    return ''.join(result)
+
+
+class MinifyMixin:
+    def get_contents(self, origin):
+        contents = super().get_contents(origin)
+        if settings.HTML_MINIFY and origin.name.endswith(MINIFY_EXTENSIONS):
+            return minify_html(contents)
+        return contents
+
+
+class FilesystemLoader(MinifyMixin, filesystem.Loader):
+    pass
+
+
+class AppDirectoriesLoader(MinifyMixin, app_directories.Loader):
+    pass
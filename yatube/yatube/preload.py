@@ -0,0 +1,113 @@
+"""
+Заголовки Link: rel=preload для критичных статических файлов.
+
+Для каждого шаблона один раз (при первом выводе в воркере) собираются
+пути из {% static %} — в нём самом, в родителях по {% extends %} и во
+включениях {% include %} с постоянным именем. Стили, шрифты и картинки
+(bootstrap.min.css, логотип, фавиконки) превращаются в адреса через
+staticfiles_storage, то есть по манифесту, если он включён.
+
+PreloadMiddleware добавляет Link к HTML-ответам TemplateResponse по
+их response.template_name и запоминает его для представления. Ответы
+render() не знают своего шаблона и остаются без Link. Следующие
+запросы к тому же представлению получают те же ссылки как 103 Early
+Hints ещё до выполнения представления — если сервер передаёт в environ
+вызываемый объект wsgi.early_hints. Gunicorn 20 такого не умеет, там
+остаётся только заголовок Link в ответе.
+"""
+import functools
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.templatetags.static import StaticNode
+
+EARLY_HINTS_KEY = 'wsgi.early_hints'
+
+
+def _constant(expression):
+    """Значение FilterExpression, если это строка-константа без фильтров."""
+    if isinstance(expression.var, str) and not expression.filters:
+        return expression.var
+    return None
+
+
+def _static_paths(engine, name, seen):
+    if name in seen:
+        return []
+    seen.add(name)
+    nodelist = engine.get_template(name).nodelist
+    paths = []
+    for node in nodelist.get_nodes_by_type(ExtendsNode):
+        parent = _constant(node.parent_name)
+        if parent:
+            paths += _static_paths(engine, parent, seen)
+    for node in nodelist.get_nodes_by_type(StaticNode):
+        path = _constant(node.path)
+        if path:
+            paths.append(path)
+    for node in nodelist.get_nodes_by_type(IncludeNode):
+        included = _constant(node.template)
+        if included:
+            paths += _static_paths(engine, included, seen)
+    return paths
+
+
+@functools.lru_cache(maxsize=None)
+def template_links(engine, name):
+    """Значения для заголовка Link по критичным файлам шаблона name."""
+    links = []
+    for path in dict.fromkeys(_static_paths(engine, name, set())):
+        kind = settings.PRELOAD_TYPES.get(os.path.splitext(path)[1].lower())
+        if kind is None:
+            continue
+        link = f'<{staticfiles_storage.url(path)}>; rel=preload; as={kind}'
+        if kind == 'font':
+            link += '; crossorigin'
+        links.append(link)
+    return tuple(links)
+
+
+def response_links(response):
+    """Ссылки по шаблону TemplateResponse; пусто для прочих ответов."""
+    if getattr(response, 'template_name', None) is None:
+        return ()
+    template = response.resolve_template(response.template_name)
+    origin = getattr(template, 'origin', None)
+    if origin is None or not origin.template_name:
+        return ()
+    return template_links(template.template.engine, origin.template_name)
+
+
+class PreloadMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.view_links = {}
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            response.status_code != 200
+            or response.streaming
+            or not response.get('Content-Type', '').startswith('text/html')
+        ):
+            return response
+        links = response_links(response)
+        match = request.resolver_match
+        if match is not None:
+            self.view_links[match.view_name] = links
+        if links:
+            existing = response.get('Link')
+            response['Link'] = ', '.join(
+                ([existing] if existing else []) + list(links)
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        send_hints = request.META.get(EARLY_HINTS_KEY)
+        if not settings.PRELOAD_EARLY_HINTS or not callable(send_hints):
+            return
+        links = self.view_links.get(request.resolver_match.view_name)
+        if links:
+            send_hints([('Link', ', '.join(links))])
@@ -0,0 +1,247 @@
+"""
+Профилирование отдельного запроса по требованию.
+
+Запрос профилируется, если в нём есть параметр ?profile (только для
+сотрудников) или заголовок X-Profile с подписанным токеном из команды
+profile_token. Режим ?profile=cprofile включает детерминированный
+cProfile, любой другой — сэмплирование стека потока запроса раз в
+PROFILE_SAMPLE_INTERVAL секунд.
+
+В PROFILE_ROOT сохраняются стеки в свёрнутом формате flamegraph.pl и
+speedscope (<id>.collapsed), для cProfile ещё <id>.prof, и <id>.json со
+временем SQL-запросов и рендера шаблонов. Id профиля приходит в
+заголовке ответа X-Profile-Id. Запросы без флага middleware не трогает,
+кроме проверки заголовка и строки запроса: замер шаблонов подменяет
+Template._render только пока идёт хотя бы один профилируемый запрос.
+"""
+import contextvars
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.template.base import Template
+
+PROFILE_PARAM = 'profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+TOKEN_SALT = 'yatube.profiler'
+
+_session = contextvars.ContextVar('profile_session', default=None)
+_patch_lock = threading.Lock()
+_profiled = 0
+_original_render = None
+
+
+def make_token():
+    return signing.dumps('profile', salt=TOKEN_SALT)
+
+
+def check_token(token):
+    try:
+        signing.loads(
+            token, salt=TOKEN_SALT, max_age=settings.PROFILE_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def frame_name(frame):
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', '?')
+    return f'{module}:{code.co_name}:{frame.f_lineno}'
+
+
+def collapse(frame):
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class Sampler(threading.Thread):
+    """Снимает стек потока запроса через равные промежутки времени."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse(frame)] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def cprofile_stacks(profile):
+    """Пары «вызывающий;вызываемый» с собственным временем в мкс."""
+    profile.create_stats()
+    stacks = Counter()
+    for (filename, lineno, name), stat in profile.stats.items():
+        own_time, callers = stat[2], stat[4]
+        callee = f'{filename}:{name}:{lineno}'
+        if not callers:
+            stacks[callee] += int(own_time * 1e6)
+        for (c_file, c_line, c_name), caller_stat in callers.items():
+            stacks[f'{c_file}:{c_name}:{c_line};{callee}'] += int(
+                caller_stat[2] * 1e6
+            )
+    return stacks
+
+
+class ProfileSession:
+    def __init__(self, mode):
+        self.mode = mode
+        self.queries = []
+        self.templates = []
+        self.profile = None
+        self.sampler = None
+
+    def query_timer(self, alias):
+        def timer(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                self.queries.append({
+                    'db': alias,
+                    'sql': sql,
+                    'ms': round((time.perf_counter() - started) * 1000, 3),
+                })
+        return timer
+
+    def start(self):
+        if self.mode == 'cprofile':
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        else:
+            self.sampler = Sampler(
+                threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL
+            )
+            self.sampler.start()
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.total_ms = round((time.perf_counter() - self.started) * 1000, 3)
+        if self.profile is not None:
+            self.profile.disable()
+        if self.sampler is not None:
+            self.sampler.stop()
+
+    def save(self, request, response):
+        profile_id = (
+            f'{time.strftime("%Y%m%d-%H%M%S")}-{uuid.uuid4().hex[:8]}'
+        )
+        base = os.path.join(settings.PROFILE_ROOT, profile_id)
+        os.makedirs(settings.PROFILE_ROOT, exist_ok=True)
+        if self.profile is not None:
+            self.profile.dump_stats(f'{base}.prof')
+            stacks = cprofile_stacks(self.profile)
+        else:
+            stacks = self.sampler.stacks
+        with open(f'{base}.collapsed', 'w', encoding='utf-8') as file_:
+            for stack, count in stacks.most_common():
+                file_.write(f'{stack} {count}\n')
+        with open(f'{base}.json', 'w', encoding='utf-8') as file_:
+            json.dump({
+                'id': profile_id,
+                'method': request.method,
+                'path': request.get_full_path(),
+                'status': response.status_code,
+                'mode': self.mode,
+                'total_ms': self.total_ms,
+                'sql_ms': round(sum(q['ms'] for q in self.queries), 3),
+                'queries': self.queries,
+                'templates': self.templates,
+            }, file_, ensure_ascii=False, indent=1)
+        return profile_id
+
+
+@contextmanager
+def timed_templates():
+    """Замер вывода шаблонов на время профилируемого запроса."""
+    global _profiled, _original_render
+    with _patch_lock:
+        if not _profiled:
+            _original_render = Template._render
+            Template._render = _timed(_original_render)
+        _profiled += 1
+    try:
+        yield
+    finally:
+        with _patch_lock:
+            _profiled -= 1
+            if not _profiled:
+                Template._render = _original_render
+
+
+def _timed(render):
+    def timed_render(self, context):
+        session = _session.get()
+        if session is None:
+            return render(self, context)
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            session.templates.append({
+                'template': self.origin.template_name or self.origin.name,
+                'ms': round((time.perf_counter() - started) * 1000, 3),
+            })
+    return timed_render
+
+
+class ProfilerMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = self.requested_mode(request)
+        if mode is None:
+            return self.get_response(request)
+        session = ProfileSession(mode)
+        token = _session.set(session)
+        try:
+            with ExitStack() as stack:
+                stack.enter_context(timed_templates())
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(
+                        session.query_timer(connection.alias)
+                    ))
+                session.start()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    session.stop()
+        finally:
+            _session.reset(token)
+        response['X-Profile-Id'] = session.save(request, response)
+        return response
+
+    def requested_mode(self, request):
+        token = request.META.get(PROFILE_HEADER)
+        if token is not None:
+            if check_token(token):
+                return request.GET.get(PROFILE_PARAM) or 'sample'
+            return None
+        if PROFILE_PARAM not in request.META.get('QUERY_STRING', ''):
+            return None
+        if PROFILE_PARAM not in request.GET or not request.user.is_staff:
+            return None
+        return request.GET[PROFILE_PARAM] or 'sample'
@@ -0,0 +1,162 @@
+"""
+Ограничение частоты изменяющих запросов.
+
+На каждого пользователя и каждый IP заводится «ведро» жетонов: запрос
+забирает по жетону из обоих вёдер, жетоны восстанавливаются равномерно.
+Вёдра лежат в отдельном sqlite-файле RATE_LIMIT_DB и общие для всех
+воркеров; проверка идёт в одной транзакции BEGIN IMMEDIATE, поэтому
+параллельные запросы не забирают один и тот же жетон.
+
+IP клиента — REMOTE_ADDR. Если запрос пришёл от доверенного прокси
+(RATE_LIMIT_TRUSTED_PROXIES), IP берётся из X-Forwarded-For: последний
+адрес справа, который не принадлежит доверенным прокси. Остальным
+X-Forwarded-For не верится, его легко подделать.
+
+RateLimitMiddleware проверяет вёдра в process_view, то есть до того, как
+CsrfViewMiddleware или представление прочитают тело запроса, и отвечает
+429 с Retry-After, не разбирая загружаемый файл.
+"""
+import ipaddress
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+
+_local = threading.local()
+
+
+def _connect():
+    # Соединение своё у каждого потока и каждого процесса после fork.
+    connection = getattr(_local, 'connection', None)
+    if connection is not None and _local.pid == os.getpid():
+        return connection
+    os.makedirs(os.path.dirname(settings.RATE_LIMIT_DB), exist_ok=True)
+    connection = sqlite3.connect(
+        settings.RATE_LIMIT_DB, timeout=5, isolation_level=None
+    )
+    connection.execute(
+        'CREATE TABLE IF NOT EXISTS bucket ('
+        'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+    )
+    connection.execute(
+        'CREATE INDEX IF NOT EXISTS bucket_updated ON bucket (updated)'
+    )
+    _local.connection, _local.pid = connection, os.getpid()
+    return connection
+
+
+def take(limits, now=None):
+    """
+    Забирает по жетону из каждого ведра limits = {ключ: (число, период)}.
+
+    Возвращает 0, если жетоны взяты, иначе сколько секунд ждать; при
+    отказе ни одно ведро не меняется.
+    """
+    if now is None:
+        now = time.time()
+    connection = _connect()
+    connection.execute('BEGIN IMMEDIATE')
+    try:
+        buckets = {}
+        wait = 0
+        for key, (capacity, period) in limits.items():
+            row = connection.execute(
+                'SELECT tokens, updated FROM bucket WHERE key = ?', (key,)
+            ).fetchone()
+            rate = capacity / period
+            tokens = capacity
+            if row is not None:
+                tokens = min(capacity, row[0] + (now - row[1]) * rate)
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) / rate)
+            buckets[key] = tokens
+        # Ведро, не тронутое дольше периода, полное — его можно не хранить.
+        connection.execute(
+            'DELETE FROM bucket WHERE updated < ?',
+            (now - max(period for _, period in limits.values()),),
+        )
+        if not wait:
+            connection.executemany(
+                'INSERT OR REPLACE INTO bucket VALUES (?, ?, ?)',
+                [(key, tokens - 1, now) for key, tokens in buckets.items()],
+            )
+        connection.execute('COMMIT')
+    except BaseException:
+        connection.execute('ROLLBACK')
+        raise
+    return wait
+
+
+def reset():
+    """Опустошает хранилище вёдер: для тестов и ручного сброса."""
+    connection = _connect()
+    connection.execute('DELETE FROM bucket')
+
+
+def is_trusted_proxy(address):
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.RATE_LIMIT_TRUSTED_PROXIES
+    )
+
+
+def get_client_ip(request):
+    """IP клиента с учётом X-Forwarded-For от доверенных прокси."""
+    remote_addr = request.META.get('REMOTE_ADDR')
+    if not remote_addr or not is_trusted_proxy(remote_addr):
+        return remote_addr
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')
+    for address in reversed(forwarded):
+        address = address.strip()
+        if address and not is_trusted_proxy(address):
+            return address
+    return remote_addr
+
+
+def request_limits(request, view_name):
+    limits = {}
+    client_ip = get_client_ip(request)
+    if client_ip:
+        limits[f'{view_name}:ip:{client_ip}'] = settings.RATE_LIMIT_PER_IP
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        limits[f'{view_name}:user:{user.pk}'] = settings.RATE_LIMIT_PER_USER
+    return limits
+
+
+class RateLimitMiddleware:
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if (
+            request.method in self.safe_methods
+            or match is None
+            or match.view_name not in settings.RATE_LIMIT_VIEWS
+        ):
+            return None
+        limits = request_limits(request, match.view_name)
+        wait = take(limits) if limits else 0
+        if not wait:
+            return None
+        response = HttpResponse(
+            'Слишком много запросов, попробуйте позже.',
+            content_type='text/plain; charset=utf-8',
+            status=429,
+        )
+        response['Retry-After'] = str(math.ceil(wait))
+        return response
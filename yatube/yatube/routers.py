@@ -0,0 +1,91 @@
+"""
+Чтение ленты с реплик.
+
+ReplicaMiddleware включает реплику только для GET/HEAD-запросов к
+представлениям из REPLICA_VIEWS. После любого изменяющего запроса
+пользователь получает подписанную cookie и REPLICA_PIN_SECONDS читает
+с основной базы, чтобы видеть собственные записи. ReplicaRouter
+отправляет чтение на случайную реплику из REPLICA_DATABASES, запись
+всегда идёт в default.
+"""
+import contextvars
+import random
+import time
+
+from django.conf import settings
+
+PIN_COOKIE = 'primary_until'
+
+_use_replica = contextvars.ContextVar('use_replica', default=False)
+
+
+class use_replica:
+    """Контекст, в котором чтение идёт с реплики."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+
+    def __enter__(self):
+        self.token = _use_replica.set(self.enabled)
+
+    def __exit__(self, *exc_info):
+        _use_replica.reset(self.token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and settings.REPLICA_DATABASES:
+            return random.choice(settings.REPLICA_DATABASES)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    safe_methods = ('GET', 'HEAD')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _use_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        if request.method not in self.safe_methods:
+            response.set_signed_cookie(
+                PIN_COOKIE,
+                str(int(time.time()) + settings.REPLICA_PIN_SECONDS),
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+            )
+        return response
+
+    def is_pinned(self, request):
+        pinned_until = request.get_signed_cookie(PIN_COOKIE, default=None)
+        try:
+            return pinned_until is not None and (
+                int(pinned_until) > time.time()
+            )
+        except ValueError:
+            return False
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if (
+            request.method in self.safe_methods
+            and match is not None
+            and match.view_name in settings.REPLICA_VIEWS
+            and not self.is_pinned(request)
+        ):
+            _use_replica.set(True)
@@ -0,0 +1,70 @@
+"""
+Сессии в общем кэше с отложенной записью в базу.
+
+Чтение сессии идёт из кэша, в django_session изменения попадают при
+создании сессии, при входе, выходе и смене пароля (меняются ключи
+авторизации) и в остальных случаях не чаще раза в
+SESSION_WRITE_BEHIND_INTERVAL секунд. При вытеснении ключа из кэша сессия
+поднимается из базы в состоянии последней синхронизации: авторизация в
+нём всегда актуальна, прочие данные могут отстать на этот интервал.
+"""
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.sessions.backends import cached_db
+from django.utils import timezone
+
+AUTH_KEYS = (
+    auth.SESSION_KEY, auth.BACKEND_SESSION_KEY, auth.HASH_SESSION_KEY,
+)
+
+
+class SessionStore(cached_db.SessionStore):
+    cache_key_prefix = 'yatube.sessions'
+
+    @property
+    def synced_key(self):
+        return f'{self.cache_key}:synced'
+
+    def auth_state(self, must_create=False):
+        session = self._get_session(no_load=must_create)
+        return [session.get(key) for key in AUTH_KEYS]
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        # Под ключом синхронизации лежат ключи авторизации, записанные в
+        # базу; если они изменились, сессия пишется в базу сразу.
+        state = self.auth_state(must_create)
+        if must_create or self._cache.get(self.synced_key) != state:
+            super().save(must_create)
+            self._cache.set(
+                self.synced_key, state, settings.SESSION_WRITE_BEHIND_INTERVAL
+            )
+            return
+        self._cache.set(
+            self.cache_key,
+            self._get_session(no_load=must_create),
+            self.get_expiry_age(),
+        )
+
+    def delete(self, session_key=None):
+        if session_key is None and self.session_key is not None:
+            session_key = self.session_key
+        if session_key is not None:
+            self._cache.delete(
+                f'{self.cache_key_prefix}{session_key}:synced'
+            )
+        super().delete(session_key)
+
+    @classmethod
+    def clear_expired(cls, batch_size=1000):
+        """Удаляет истёкшие сессии пачками, не держа долгую блокировку."""
+        model = cls.get_model_class()
+        expired = model.objects.filter(expire_date__lt=timezone.now())
+        while True:
+            keys = list(
+                expired.values_list('session_key', flat=True)[:batch_size]
+            )
+            if not keys:
+                break
+            model.objects.filter(session_key__in=keys).delete()
@@ -2,9 +2,10 @@ import os
 
 from dotenv import load_dotenv
 
-load_dotenv()
-
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Явный путь, чтобы не искать .env по дереву каталогов при каждом старте.
+load_dotenv(os.path.join(BASE_DIR, 'yatube', '.env'))
 SECRET_KEY = '(pr6$=k)5w28rdp*@q_u!@lw6jpx_x$a@pcpgmv#th_aiqo#pb'
 
 # Настройки для deploy
@@ -28,7 +29,9 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # Без автообнаружения: admin.py подключаются в urls.py, то есть
+    # только когда нужен URLconf, а не при каждом старте manage.py.
+    'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -41,10 +44,17 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'yatube.preload.PreloadMiddleware',
+    'yatube.slowqueries.SlowQueryMiddleware',
+    'yatube.surrogate.SurrogateKeyMiddleware',
+    'yatube.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'yatube.routers.ReplicaMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'yatube.ratelimit.RateLimitMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yatube.auth.CachedUserAuthenticationMiddleware',
+    'yatube.profiler.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -52,12 +62,20 @@ MIDDLEWARE = [
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+# Сжимать ли HTML-шаблоны при загрузке (yatube.minify).
+HTML_MINIFY = True
+TEMPLATE_LOADERS = [
+    'yatube.minify.FilesystemLoader',
+    'yatube.minify.AppDirectoriesLoader',
+]
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -71,18 +89,75 @@ TEMPLATES = [
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+    },
+    # Общий для всех воркеров кэш сессий, без внешних сервисов.
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'sessions'),
+        # По два файла на сессию: данные и отметка синхронизации. При
+        # переполнении часть сессий вытесняется и поднимается из базы.
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+        },
+    },
+    # Общий для всех воркеров кэш лент, их версии и фрагментов главной:
+    # сброс в одном воркере виден остальным.
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'shared'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
 }
 
+# Сессии читаются из кэша, в базу пишутся при входе и выходе и в
+# остальном не чаще раза в интервал.
+SESSION_ENGINE = 'yatube.sessions'
+SESSION_CACHE_ALIAS = 'sessions'
+SESSION_WRITE_BEHIND_INTERVAL = 5 * 60
+
+# Сколько секунд воркер держит пользователя в памяти и сколько
+# пользователей максимум.
+AUTH_USER_CACHE_TIMEOUT = 30
+AUTH_USER_CACHE_SIZE = 1024
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+    },
+    # Реплика для чтения ленты. Локально это тот же файл или, через
+    # DB_REPLICA_NAME, второй sqlite-файл вместо настоящей реплики.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv(
+            'DB_REPLICA_NAME', os.path.join(BASE_DIR, 'db.sqlite3')
+        ),
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
 }
 
+DATABASE_ROUTERS = ['yatube.routers.ReplicaRouter']
+# Пока реплика не задана через DB_REPLICA_NAME, всё читается с default.
+REPLICA_DATABASES = ['replica'] if os.getenv('DB_REPLICA_NAME') else []
+# Представления, которые только читают и могут читать с реплики.
+REPLICA_VIEWS = (
+    'posts:index',
+    'posts:home',
+    'posts:post_detail',
+    'posts:feed_rss',
+    'posts:feed_atom',
+    'posts:group_feed_rss',
+    'posts:group_feed_atom',
+)
+# Сколько секунд после своей записи пользователь читает с основной базы.
+REPLICA_PIN_SECONDS = 10
+
 # if ENABLE_PROD:
 #     DATABASES = {
 #         'default': {
@@ -143,3 +218,124 @@ DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
 
 NUMBER_POST = 10
 CHARS_LENGTH = 15
+
+# Количество постов в RSS/Atom ленте, время жизни её кэша и общий для
+# воркеров кэш, где лежит версия лент.
+FEED_SIZE = 20
+FEED_CACHE_TIMEOUT = 60 * 60
+FEED_CACHE_ALIAS = 'shared'
+
+# Сжатие ответов: уровень, минимальный размер тела и типы, которые
+# уже сжаты и не выигрывают от повторного сжатия.
+COMPRESSION_LEVEL = 6
+COMPRESSION_MIN_LENGTH = 200
+COMPRESSION_SKIP_TYPES = (
+    'image/png',
+    'image/jpeg',
+    'image/gif',
+    'image/webp',
+    'video/',
+    'audio/',
+    'font/woff',
+    'application/zip',
+    'application/gzip',
+    'application/x-gzip',
+)
+COMPRESSION_CACHE_ALIAS = 'default'
+COMPRESSION_CACHE_TIMEOUT = 60 * 60
+
+# Хост, для которого при прогреве воркера собираются ленты.
+WARMUP_HOST = os.getenv('WARMUP_HOST', 'localhost')
+
+# Бюджет холодного старта yatube.wsgi для startup_profile --check, мс.
+STARTUP_BUDGET_MS = 1500
+
+# Метаданные миниатюр: пачкой на страницу и LRU в памяти воркера.
+THUMBNAIL_KVSTORE = 'posts.thumbnails.KVStore'
+THUMBNAIL_BACKEND = 'posts.thumbnails.ThumbnailBackend'
+THUMBNAIL_LRU_SIZE = 4096
+THUMBNAIL_LRU_TIMEOUT = 5 * 60
+
+# Дальше этого числа строк админка не считает записи в списке.
+ADMIN_COUNT_LIMIT = 10000
+
+# Массовые операции из админки: размер пачки и папка для выгрузок.
+BULK_JOB_CHUNK_SIZE = 1000
+EXPORT_ROOT = os.path.join(BASE_DIR, 'exports')
+
+# Строк в одной порции .iterator() и в одном куске потокового ответа.
+EXPORT_CHUNK_SIZE = 2000
+
+# Посты старше стольких дней archive_posts переносит в архив.
+ARCHIVE_AFTER_DAYS = 365
+
+# Большие таблицы, полное чтение которых check_query_plans считает
+# регрессией, и сколько постов добавлять перед проверкой.
+QUERY_PLAN_TABLES = ('posts_post',)
+QUERY_PLAN_SEED = 20000
+
+# Частота создания постов: (запросов, за секунд) на пользователя и на IP.
+# Вёдра общие для воркеров и лежат в отдельном sqlite-файле.
+RATE_LIMIT_VIEWS = ('posts:post_create',)
+RATE_LIMIT_PER_USER = (10, 10 * 60)
+RATE_LIMIT_PER_IP = (30, 10 * 60)
+RATE_LIMIT_DB = os.path.join(BASE_DIR, 'cache', 'ratelimit.sqlite3')
+# Адреса и сети прокси перед приложением (через запятую в окружении),
+# от которых IP клиента берётся из X-Forwarded-For.
+RATE_LIMIT_TRUSTED_PROXIES = [
+    proxy.strip()
+    for proxy in os.getenv('RATE_LIMIT_TRUSTED_PROXIES', '').split(',')
+    if proxy.strip()
+]
+
+# Кэш без одновременных пересчётов (yatube.stampede): просроченное
+# значение ещё STAMPEDE_STALE_TIMEOUT секунд отдаётся, пока его
+# пересчитывает один запрос. Значения в общем кэше, блокировки и
+# счётчики — в sqlite-файле, общем для воркеров.
+STAMPEDE_CACHE_ALIAS = 'shared'
+STAMPEDE_DB = os.path.join(BASE_DIR, 'cache', 'stampede.sqlite3')
+STAMPEDE_LOCK_TIMEOUT = 10
+STAMPEDE_STALE_TIMEOUT = 60
+STAMPEDE_BETA = 1.0
+# Сколько секунд кэшируется первая страница главной.
+INDEX_CACHE_TIMEOUT = 60
+
+# Журнал медленных запросов: порог в мс (None — выключен), файл и
+# сколько его копий после ротации logrotate (.1, .2, ...) читает сводка
+# slow_queries. Ротация — deploy/logrotate/yatube.
+SLOW_QUERY_MS = 100
+SLOW_QUERY_LOG = os.path.join(BASE_DIR, 'logs', 'slow_queries.log')
+SLOW_QUERY_LOG_BACKUPS = 5
+
+# Профиль запроса по ?profile (для сотрудников) или заголовку X-Profile
+# с токеном из команды profile_token.
+PROFILE_ROOT = os.path.join(BASE_DIR, 'profiles')
+PROFILE_SAMPLE_INTERVAL = 0.005
+PROFILE_TOKEN_MAX_AGE = 60 * 60
+
+# Карта сайта: файлы пишет build_sitemap, новый пост дописывается в
+# последний шард; веб-сервер раздаёт SITEMAP_ROOT по SITEMAP_URL.
+SITEMAP_ROOT = os.path.join(BASE_DIR, 'sitemaps')
+SITEMAP_URL = '/sitemaps/'
+SITEMAP_BASE_URL = os.getenv('SITEMAP_BASE_URL', 'http://localhost')
+SITEMAP_SHARD_SIZE = 50000
+
+# Кэширующий прокси перед gunicorn: сколько он хранит помеченные ответы
+# и куда слать сброс по ключам (без SURROGATE_PURGE_URL сброс выключен).
+SURROGATE_MAX_AGE = 24 * 60 * 60
+SURROGATE_PURGE_URL = os.getenv('SURROGATE_PURGE_URL')
+SURROGATE_PURGE_METHOD = os.getenv('SURROGATE_PURGE_METHOD', 'PURGE')
+SURROGATE_PURGE_HEADERS = {}
+SURROGATE_PURGE_BATCH = 256
+SURROGATE_PURGE_TIMEOUT = 2
+
+# Preload критичных статических файлов: значение as по расширению файла
+# и отправка 103 Early Hints, если сервер это поддерживает.
+PRELOAD_TYPES = {
+    '.css': 'style',
+    '.woff2': 'font',
+    '.png': 'image',
+    '.svg': 'image',
+    '.ico': 'image',
+}
+PRELOAD_EARLY_HINTS = True
@@ -0,0 +1,53 @@
+"""Настройки для быстрого прогона тестов: всё, что можно, — в памяти."""
+import atexit
+import os
+import shutil
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+# База тестов — sqlite в памяти, реплика смотрит в неё же.
+DATABASES['default'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': ':memory:',
+}
+
+# Медленный PBKDF2 в тестах не нужен.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+    },
+    # То же хранилище, что у default: cache.clear() в тестах сбрасывает
+    # и ленты с фрагментами.
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Хранилище картинок работает с файлами (жёсткие ссылки), поэтому медиа
+# лежат в tmpfs, если он есть; у каждого процесса прогона своя папка.
+TEST_TMP_ROOT = tempfile.mkdtemp(
+    prefix='yatube-tests-',
+    dir='/dev/shm' if os.path.isdir('/dev/shm') else None,
+)
+atexit.register(shutil.rmtree, TEST_TMP_ROOT, ignore_errors=True)
+MEDIA_ROOT = os.path.join(TEST_TMP_ROOT, 'media')
+EXPORT_ROOT = os.path.join(TEST_TMP_ROOT, 'exports')
+RATE_LIMIT_DB = os.path.join(TEST_TMP_ROOT, 'ratelimit.sqlite3')
+STAMPEDE_DB = os.path.join(TEST_TMP_ROOT, 'stampede.sqlite3')
+SLOW_QUERY_LOG = os.path.join(TEST_TMP_ROOT, 'slow_queries.log')
+PROFILE_ROOT = os.path.join(TEST_TMP_ROOT, 'profiles')
+SITEMAP_ROOT = os.path.join(TEST_TMP_ROOT, 'sitemaps')
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+]
+
+# Планы запросов в тестах проверяются на наборе поменьше.
+QUERY_PLAN_SEED = 2000
@@ -0,0 +1,192 @@
+"""
+Журнал медленных запросов к базе.
+
+SlowQueryMiddleware на время запроса оборачивает выполнение SQL на всех
+соединениях. Запрос дольше SLOW_QUERY_MS пишется строкой JSON в
+SLOW_QUERY_LOG вместе с представлением, которое его вызвало
+(posts:index, admin:posts_post_changelist), шаблоном и строкой шаблона,
+при выводе которых он выполнен (например, includes/card.html, где
+карточка обращается к post.author), и укороченным стеком кода проекта.
+
+SQL нормализуется (значения и списки IN заменяются на ?), по нему
+считается отпечаток; команда slow_queries сводит журнал по отпечаткам.
+
+В файл пишут все воркеры gunicorn, а ротация logging между процессами
+небезопасна, поэтому файл ротирует logrotate по deploy/logrotate/yatube
+(size 10M, rotate 5, без copytruncate и сжатия), а WatchedFileHandler
+каждого воркера переоткрывает его после переименования. Без этого
+конфига на сервере журнал растёт без ограничений.
+"""
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+import traceback
+from contextlib import ExitStack
+from logging.handlers import WatchedFileHandler
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.base import Node, Template
+
+logger = logging.getLogger(__name__)
+
+_request = contextvars.ContextVar('slow_query_request', default=None)
+
+STACK_DEPTH = 8
+
+NORMALIZE = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def normalize(sql):
+    """SQL без конкретных значений: одинаков для запросов одного вида."""
+    for pattern, replacement in NORMALIZE:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()[:16]
+
+
+# Код исходных методов, а не текущих атрибутов класса: профилировщик на
+# время своих запросов подменяет Template._render обёрткой.
+NODE_RENDER_CODE = Node.render_annotated.__code__
+TEMPLATE_RENDER_CODE = Template._render.__code__
+
+
+def template_position():
+    """Самые вложенные шаблон и строка в нём в текущем стеке."""
+    frame = sys._getframe()
+    while frame is not None:
+        owner = frame.f_locals.get('self')
+        if frame.f_code is NODE_RENDER_CODE:
+            token = getattr(owner, 'token', None)
+            origin = getattr(owner, 'origin', None)
+            if origin is not None:
+                name = origin.template_name or origin.name
+                return f'{name}:{getattr(token, "lineno", None)}'
+        elif frame.f_code is TEMPLATE_RENDER_CODE:
+            return owner.origin.template_name or owner.origin.name
+        frame = frame.f_back
+    return None
+
+
+def project_stack():
+    """Последние кадры стека из кода проекта, без самого журнала."""
+    root = str(settings.BASE_DIR)
+    frames = [
+        f'{os.path.relpath(frame.filename, root)}:{frame.lineno} '
+        f'{frame.name}'
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(root)
+        and frame.filename != __file__
+        and '/site-packages/' not in frame.filename
+    ]
+    return frames[-STACK_DEPTH:]
+
+
+def get_log():
+    if not logger.handlers:
+        os.makedirs(os.path.dirname(settings.SLOW_QUERY_LOG), exist_ok=True)
+        handler = WatchedFileHandler(
+            settings.SLOW_QUERY_LOG, encoding='utf-8'
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.WARNING)
+        logger.propagate = False
+    return logger
+
+
+def report(alias, sql, duration):
+    normalized = normalize(sql)
+    request = _request.get() or {}
+    get_log().warning(json.dumps({
+        'time': round(time.time(), 3),
+        'ms': round(duration * 1000, 3),
+        'db': alias,
+        'fingerprint': fingerprint(normalized),
+        'sql': normalized,
+        'path': request.get('path'),
+        'view': request.get('view'),
+        'template': template_position(),
+        'stack': project_stack(),
+    }, ensure_ascii=False))
+
+
+class QueryTimer:
+    def __init__(self, alias):
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.monotonic() - started
+            if duration * 1000 >= settings.SLOW_QUERY_MS:
+                report(self.alias, sql, duration)
+
+
+class SlowQueryMiddleware:
+    def __init__(self, get_response):
+        if settings.SLOW_QUERY_MS is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _request.set({'path': request.path, 'view': None})
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(
+                        QueryTimer(connection.alias)
+                    ))
+                return self.get_response(request)
+        finally:
+            _request.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if match is not None:
+            _request.get()['view'] = match.view_name
+
+
+def aggregate(lines):
+    """Сводка записей журнала по отпечаткам, самые затратные первыми."""
+    summary = {}
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        item = summary.setdefault(entry['fingerprint'], {
+            'fingerprint': entry['fingerprint'],
+            'sql': entry['sql'],
+            'count': 0,
+            'total_ms': 0,
+            'max_ms': 0,
+            'views': set(),
+            'templates': set(),
+        })
+        item['count'] += 1
+        item['total_ms'] += entry['ms']
+        item['max_ms'] = max(item['max_ms'], entry['ms'])
+        for field, key in (('views', 'view'), ('templates', 'template')):
+            if entry.get(key):
+                item[field].add(entry[key])
+    return sorted(
+        summary.values(), key=lambda item: item['total_ms'], reverse=True
+    )
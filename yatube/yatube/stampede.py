@@ -0,0 +1,173 @@
+"""
+Кэш без «набегов» на пересчёт.
+
+get_or_compute() хранит вместе со значением срок свежести и время
+пересчёта. Незадолго до истечения значение обновляется заранее с
+вероятностью, растущей к концу срока (тем раньше, чем дольше пересчёт).
+Истёкшее значение ещё STAMPEDE_STALE_TIMEOUT секунд отдаётся как есть,
+пока его пересчитывает один запрос: пересчёт ключа держит блокировку,
+остальные запросы его не повторяют. Сколько пересчётов удалось так
+объединить, видно в stats().
+
+Значения лежат в общем кэше STAMPEDE_CACHE_ALIAS. Блокировки и счётчики
+— в sqlite-файле STAMPEDE_DB, как вёдра yatube.ratelimit: add() файлового
+кэша не атомарен, а блокировка должна быть одна на все воркеры.
+"""
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+
+EVENTS = ('computed', 'early', 'stale', 'coalesced')
+POLL_INTERVAL = 0.05
+
+_local = threading.local()
+
+
+def get_cache():
+    return caches[settings.STAMPEDE_CACHE_ALIAS]
+
+
+def _connect():
+    # Соединение своё у каждого потока и каждого процесса после fork.
+    connection = getattr(_local, 'connection', None)
+    if connection is not None and _local.pid == os.getpid():
+        return connection
+    os.makedirs(os.path.dirname(settings.STAMPEDE_DB), exist_ok=True)
+    connection = sqlite3.connect(
+        settings.STAMPEDE_DB, timeout=5, isolation_level=None
+    )
+    connection.execute(
+        'CREATE TABLE IF NOT EXISTS lock ('
+        'key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)'
+    )
+    connection.execute(
+        'CREATE TABLE IF NOT EXISTS event ('
+        'name TEXT PRIMARY KEY, count INTEGER NOT NULL)'
+    )
+    _local.connection, _local.pid = connection, os.getpid()
+    return connection
+
+
+def record(event):
+    _connect().execute(
+        'INSERT INTO event VALUES (?, 1) '
+        'ON CONFLICT (name) DO UPDATE SET count = count + 1',
+        (event,),
+    )
+
+
+def stats():
+    """Счётчики событий: сколько раз считали, обновляли и объединяли."""
+    counts = dict(_connect().execute('SELECT name, count FROM event'))
+    return {e: counts.get(e, 0) for e in EVENTS}
+
+
+def reset_stats():
+    _connect().execute('DELETE FROM event')
+
+
+def reset():
+    """Снимает все блокировки и обнуляет счётчики: для тестов."""
+    _connect().execute('DELETE FROM lock')
+    reset_stats()
+
+
+def _lock(key):
+    """Берёт блокировку пересчёта key; возвращает владельца или None."""
+    owner = uuid.uuid4().hex
+    now = time.time()
+    connection = _connect()
+    connection.execute('BEGIN IMMEDIATE')
+    try:
+        # Блокировка упавшего воркера истекает через
+        # STAMPEDE_LOCK_TIMEOUT.
+        connection.execute(
+            'DELETE FROM lock WHERE key = ? AND expires <= ?', (key, now)
+        )
+        taken = connection.execute(
+            'INSERT OR IGNORE INTO lock VALUES (?, ?, ?)',
+            (key, owner, now + settings.STAMPEDE_LOCK_TIMEOUT),
+        ).rowcount
+        connection.execute('COMMIT')
+    except BaseException:
+        connection.execute('ROLLBACK')
+        raise
+    return owner if taken else None
+
+
+def _unlock(key, owner):
+    _connect().execute(
+        'DELETE FROM lock WHERE key = ? AND owner = ?', (key, owner)
+    )
+
+
+@contextmanager
+def single_flight(key):
+    """
+    Пропускает внутрь по одному на ключ; остальные ждут, пока он выйдет.
+
+    Ждут не дольше STAMPEDE_LOCK_TIMEOUT, после этого входят без
+    блокировки.
+    """
+    deadline = time.monotonic() + settings.STAMPEDE_LOCK_TIMEOUT
+    owner = _lock(key)
+    if owner is None:
+        record('coalesced')
+        while owner is None and time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            owner = _lock(key)
+    try:
+        yield
+    finally:
+        if owner is not None:
+            _unlock(key, owner)
+
+
+def _compute(key, compute, timeout):
+    started = time.monotonic()
+    value = compute()
+    delta = time.monotonic() - started
+    get_cache().set(
+        key,
+        (value, time.time() + timeout, delta),
+        timeout + settings.STAMPEDE_STALE_TIMEOUT,
+    )
+    record('computed')
+    return value
+
+
+def get_or_compute(key, compute, timeout):
+    """Значение из кэша по key или результат compute() на timeout секунд."""
+    cache = get_cache()
+    entry = cache.get(key)
+    if entry is not None:
+        value, expires, delta = entry
+        now = time.time()
+        # Вероятностное раннее обновление (XFetch): -log(U) > 0 сдвигает
+        # момент пересчёта раньше срока на величину порядка delta.
+        gap = -delta * settings.STAMPEDE_BETA * math.log(1 - random.random())
+        if now + gap < expires:
+            return value
+        owner = _lock(key)
+        if owner is None:
+            record('coalesced')
+            return value
+        try:
+            record('early' if now < expires else 'stale')
+            return _compute(key, compute, timeout)
+        finally:
+            _unlock(key, owner)
+    with single_flight(key):
+        # Пока ждали блокировку, значение мог посчитать другой запрос.
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+        return _compute(key, compute, timeout)
@@ -0,0 +1,88 @@
+"""
+Теги суррогатных ключей для кэширующего прокси и их сброс.
+
+Представление помечает ответ ключами через tag_response(): id постов,
+slug групп, общий ключ лент. SurrogateKeyMiddleware для помеченных
+ответов на GET/HEAD без cookie добавляет Surrogate-Key и
+Surrogate-Control с временем хранения на прокси SURROGATE_MAX_AGE, а
+браузеру оставляет Cache-Control max-age=0: свежесть обеспечивает сброс.
+
+purge() после коммита транзакции отправляет на SURROGATE_PURGE_URL запрос
+SURROGATE_PURGE_METHOD с ключами в заголовке Surrogate-Key, по
+SURROGATE_PURGE_BATCH ключей в запросе. Без SURROGATE_PURGE_URL сброс
+выключен. Ошибка прокси не ломает запрос, а только пишется в лог.
+"""
+import logging
+import urllib.request
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'Surrogate-Key'
+
+
+def tag_response(response, *keys):
+    """Добавляет ключи к заголовку Surrogate-Key ответа."""
+    existing = response.get(HEADER, '').split()
+    new = [key for key in keys if key and key not in existing]
+    if new:
+        response[HEADER] = ' '.join(existing + new)
+    return response
+
+
+def send_purge(keys):
+    keys = sorted(set(keys))
+    batch = settings.SURROGATE_PURGE_BATCH
+    for start in range(0, len(keys), batch):
+        request = urllib.request.Request(
+            settings.SURROGATE_PURGE_URL,
+            method=settings.SURROGATE_PURGE_METHOD,
+            headers={
+                **settings.SURROGATE_PURGE_HEADERS,
+                HEADER: ' '.join(keys[start:start + batch]),
+            },
+        )
+        try:
+            with urllib.request.urlopen(
+                request, timeout=settings.SURROGATE_PURGE_TIMEOUT
+            ):
+                pass
+        except OSError:
+            logger.exception('Не удалось сбросить ключи %s', keys)
+
+
+def purge(*keys):
+    """Сбрасывает на прокси ответы с этими ключами после коммита."""
+    if not settings.SURROGATE_PURGE_URL or not keys:
+        return
+    transaction.on_commit(lambda: send_purge(keys))
+
+
+class SurrogateKeyMiddleware:
+    cacheable_methods = ('GET', 'HEAD')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if HEADER not in response:
+            return response
+        vary = response.get('Vary', '').lower()
+        if (
+            request.method in self.cacheable_methods
+            and response.status_code == 200
+            and not response.cookies
+            and 'cookie' not in vary
+            and 'private' not in response.get('Cache-Control', '')
+        ):
+            response['Surrogate-Control'] = (
+                f'max-age={settings.SURROGATE_MAX_AGE}'
+            )
+            patch_cache_control(response, public=True, max_age=0)
+        else:
+            del response[HEADER]
+        return response
@@ -3,6 +3,7 @@ from django.urls import include, path
 from django.conf.urls.static import static
 from django.conf import settings
 
+admin.autodiscover()
 
 urlpatterns = [
     path('auth/', include('django.contrib.auth.urls')),
@@ -15,3 +16,6 @@ if settings.DEBUG:
     urlpatterns += static(
         settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
     )
+    urlpatterns += static(
+        settings.SITEMAP_URL, document_root=settings.SITEMAP_ROOT
+    )
@@ -0,0 +1,77 @@
+"""
+Прогрев воркера после fork: шаблоны, соединения с базой, ленты и
+манифест статики собираются до того, как придут первые запросы.
+"""
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.db import connections
+from django.template import engines
+
+logger = logging.getLogger(__name__)
+
+CRITICAL_STATIC = (
+    'css/bootstrap.min.css',
+    'img/logo.png',
+    'img/fav/apple-touch-icon.png',
+    'img/fav/favicon-32x32.png',
+    'img/fav/favicon-16x16.png',
+)
+
+
+def compile_templates():
+    count = 0
+    for engine in engines.all():
+        for template_dir in getattr(engine, 'dirs', ()):
+            for root, _, files in os.walk(template_dir):
+                for name in files:
+                    if not name.endswith('.html'):
+                        continue
+                    path = os.path.join(root, name)
+                    engine.get_template(os.path.relpath(path, template_dir))
+                    count += 1
+    return count
+
+
+def open_connections():
+    for connection in connections.all():
+        connection.ensure_connection()
+    return len(connections.all())
+
+
+def prime_feeds():
+    from posts.feeds import prime_feeds
+
+    prime_feeds(settings.WARMUP_HOST)
+
+
+def prime_static_manifest():
+    # Для манифестного хранилища первый url() читает staticfiles.json.
+    for path in CRITICAL_STATIC:
+        staticfiles_storage.url(path)
+
+
+STEPS = (
+    ('templates', compile_templates),
+    ('database', open_connections),
+    ('feeds', prime_feeds),
+    ('static', prime_static_manifest),
+)
+
+
+def warm_up():
+    """Прогревает воркер. Ошибка шага не мешает воркеру стартовать."""
+    for name, step in STEPS:
+        started = time.monotonic()
+        try:
+            step()
+        except Exception:
+            logger.exception('Warm-up step %s failed', name)
+            continue
+        logger.info(
+            'Warm-up step %s done in %.1f ms',
+            name, (time.monotonic() - started) * 1000,
+        )